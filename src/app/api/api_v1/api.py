@@ -8,6 +8,7 @@ from app.api.api_v1.routes import expense_route
 from app.api.api_v1.routes import category_route
 from app.api.api_v1.routes import analysis_route
 from app.api.api_v1.routes import google_auth
+from app.api.api_v1.routes import health_route
 
 api_router = APIRouter()
 
@@ -19,3 +20,4 @@ api_router.include_router(
 )
 api_router.include_router(analysis_route.router, prefix="/analysis", tags=["Analysis"])
 api_router.include_router(google_auth.router, prefix="/google", tags=["Google Auth"])
+api_router.include_router(health_route.router, prefix="/health", tags=["Health"])
@@ -1,23 +1,66 @@
-from fastapi import APIRouter, Depends, status
+from datetime import date
+from functools import partial
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.user import UserResponse
-from app.schemas.common.enum import TimePeriod
+from app.schemas.common.enum import TimeBucket, TimePeriod
 from app.sql_app.database import get_db
 from app.services import data_analysis_service
-from app.services import auth_service
+from app.services import auth_service, user_service
 from app.services.utils.processors import process_request
 
 router = APIRouter()
 
 
+@router.get(
+    "/timeseries",
+    status_code=status.HTTP_200_OK,
+    description="Get the expenses of a user summed per day, week or month in the user's timezone.",
+)
+async def get_expense_timeseries(
+    request: Request,
+    bucket: TimeBucket = Query(default=TimeBucket.DAY),
+    start: Optional[date] = Query(default=None, alias="from"),
+    end: Optional[date] = Query(default=None, alias="to"),
+    category: Optional[str] = Query(default=None),
+    user: UserResponse = Depends(auth_service.get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    """
+    Get the expenses of a user summed per day, week or month.
+    """
+
+    async def _get_expense_timeseries():
+        return await data_analysis_service.get_expense_timeseries(
+            user_id=user.id,
+            user_timezone=user.timezone,
+            bucket=bucket,
+            start=start,
+            end=end,
+            category=category,
+            db=db,
+        )
+
+    return await process_request(
+        get_entities_fn=_get_expense_timeseries,
+        status_code=status.HTTP_200_OK,
+        not_found_err_msg="User not found.",
+        etag_fn=partial(user_service.get_data_etag, user=user, db=db),
+        request=request,
+    )
+
+
 @router.get(
     "/{time_period}",
     status_code=status.HTTP_200_OK,
     description="Get the total expenses for a user in a given time period.",
 )
 async def analyze_expenses(
+    request: Request,
     time_period: TimePeriod,
     user: UserResponse = Depends(auth_service.get_current_user),
     db: AsyncSession = Depends(get_db),
@@ -35,4 +78,6 @@ async def analyze_expenses(
         get_entities_fn=_analyze_expenses,
         status_code=status.HTTP_200_OK,
         not_found_err_msg="User not found.",
+        etag_fn=partial(user_service.get_data_etag, user=user, db=db),
+        request=request,
     )
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, status
+from functools import partial
+
+from fastapi import APIRouter, Depends, Request, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -6,7 +8,7 @@ from app.schemas.category import CategoryCreate
 from app.schemas.user import UserResponse
 from app.sql_app.database import get_db
 from app.services import category_service
-from app.services import auth_service
+from app.services import auth_service, user_service
 from app.services.utils.processors import process_request
 
 router = APIRouter()
@@ -40,6 +42,7 @@ async def create_category(
     description="Get all categories.",
 )
 async def get_categories(
+    request: Request,
     user: UserResponse = Depends(auth_service.get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> JSONResponse:
@@ -54,4 +57,23 @@ async def get_categories(
         get_entities_fn=_get_categories,
         status_code=status.HTTP_200_OK,
         not_found_err_msg="Cannot fetch categories.",
+        etag_fn=partial(user_service.get_data_etag, user=user, db=db),
+        request=request,
+    )
+
+
+@router.get(
+    "/cache/stats",
+    description="Get the hit and miss counters of the category catalogue",
+    dependencies=[Depends(auth_service.require_admin_role)],
+    status_code=status.HTTP_200_OK,
+)
+async def get_category_catalogue_stats() -> JSONResponse:
+    async def _get_category_catalogue_stats():
+        return category_service.get_catalogue_stats()
+
+    return await process_request(
+        get_entities_fn=_get_category_catalogue_stats,
+        status_code=status.HTTP_200_OK,
+        not_found_err_msg="Could not fetch category catalogue stats",
     )
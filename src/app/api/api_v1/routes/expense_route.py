@@ -1,25 +1,42 @@
+from functools import partial
+from typing import Literal, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.schemas.common.application_error import ApplicationError
 from app.schemas.common.common import FilterOptions
 from app.schemas.user import UserResponse
-from app.schemas.expense import ExpenseCreate, ExpenseUpdate, Note
+from app.schemas.expense import (
+    ExpenseBatchCreate,
+    ExpenseCreate,
+    ExpensePage,
+    ExpenseResponse,
+    ExpenseUpdate,
+    Note,
+)
 from app.sql_app.database import get_db
 from app.services import expense_service
-from app.services import auth_service
+from app.services import auth_service, user_service
 from app.services.utils.processors import process_request
 
 router = APIRouter()
 
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
 
 @router.get(
     "/",
     status_code=status.HTTP_200_OK,
-    description="Get all expenses for a user.",
+    description="Get all expenses for a user. Cursor pagination returns an "
+    "ExpensePage, offset pagination a list of expenses.",
+    # Documents the response only: the route returns the serialized JSON, which
+    # FastAPI does not validate again.
+    response_model=Union[list[ExpenseResponse], ExpensePage],
 )
 async def get_user_expenses(
+    request: Request,
     filter_options: FilterOptions = Depends(),
     user: UserResponse = Depends(auth_service.get_current_user),
     db: AsyncSession = Depends(get_db),
@@ -37,6 +54,59 @@ async def get_user_expenses(
         get_entities_fn=_get_user_expenses,
         status_code=status.HTTP_200_OK,
         not_found_err_msg="User not found.",
+        etag_fn=partial(user_service.get_data_etag, user=user, db=db),
+        request=request,
+    )
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    description="Export all expenses of a user matching the filters as CSV or NDJSON.",
+)
+async def export_expenses(
+    export_format: Literal["csv", "ndjson"] = Query(default="csv", alias="format"),
+    filter_options: FilterOptions = Depends(),
+    user: UserResponse = Depends(auth_service.get_current_user),
+) -> Response:
+    """
+    Stream all expenses of a user matching the filters.
+
+    The filters are validated before the response starts, an invalid one is
+    answered with an error instead of a broken stream.
+    """
+    try:
+        chunks = await expense_service.export_expenses(
+            user_id=user.id, filter_options=filter_options, export_format=export_format
+        )
+    except ApplicationError as ex:
+        return JSONResponse(
+            status_code=ex.data.status,
+            content={"detail": {"error": ex.data.detail}},
+        )
+    return StreamingResponse(
+        content=chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="expenses.{export_format}"'
+        },
+    )
+
+
+@router.get(
+    "/names/cache/stats",
+    description="Get the hit and miss counters of the expense name cache",
+    dependencies=[Depends(auth_service.require_admin_role)],
+    status_code=status.HTTP_200_OK,
+)
+async def get_expense_name_cache_stats() -> JSONResponse:
+    async def _get_expense_name_cache_stats():
+        return expense_service.get_expense_name_cache_stats()
+
+    return await process_request(
+        get_entities_fn=_get_expense_name_cache_stats,
+        status_code=status.HTTP_200_OK,
+        not_found_err_msg="Could not fetch expense name cache stats",
     )
 
 
@@ -62,6 +132,29 @@ async def create_expense(
     )
 
 
+@router.post(
+    "/batch",
+    status_code=status.HTTP_201_CREATED,
+    description="Create many expenses for a user in one request. "
+    "Invalid items are reported in errors without failing the batch.",
+)
+async def create_expenses_batch(
+    batch: ExpenseBatchCreate,
+    user: UserResponse = Depends(auth_service.get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    async def _create_expenses_batch():
+        return await expense_service.create_expenses_batch(
+            user_id=user.id, items=batch.items, db=db
+        )
+
+    return await process_request(
+        get_entities_fn=_create_expenses_batch,
+        status_code=status.HTTP_201_CREATED,
+        not_found_err_msg="User not found.",
+    )
+
+
 @router.patch(
     "/{expense_id}",
     status_code=status.HTTP_200_OK,
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.sql_app.database import get_db
+from app.services import health_service
+from app.services.utils.processors import process_request
+
+router = APIRouter()
+
+
+@router.get(
+    "/db",
+    status_code=status.HTTP_200_OK,
+    description="Ping the database and report the live connection pool counts.",
+)
+async def get_db_health(db: AsyncSession = Depends(get_db)) -> JSONResponse:
+    """
+    Ping the database and report the live connection pool counts.
+    """
+
+    async def _get_db_health():
+        return await health_service.get_db_health(db=db)
+
+    return await process_request(
+        get_entities_fn=_get_db_health,
+        status_code=status.HTTP_200_OK,
+        not_found_err_msg="Could not check the database health",
+    )
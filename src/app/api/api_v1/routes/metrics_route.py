@@ -0,0 +1,22 @@
+from fastapi import APIRouter, status
+from fastapi.responses import Response
+
+from app.core import metrics
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    description="Get the request, database and cache metrics in the Prometheus text format.",
+    include_in_schema=False,
+)
+async def get_metrics() -> Response:
+    """
+    Get the request, database and cache metrics in the Prometheus text format.
+    """
+    return Response(
+        content=metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -7,6 +7,7 @@ from app.sql_app.database import get_db
 from app.schemas.user import BaseUser, UpdateUser, UserRegistration, UserResponse
 from app.services import user_service
 from app.services import auth_service
+from app.services.utils import hashing
 from app.services.utils.processors import process_request
 
 router = APIRouter()
@@ -66,6 +67,40 @@ async def get_all(
     )
 
 
+@router.get(
+    "/cache/stats",
+    description="Get the hit and miss counters of the authenticated user cache",
+    dependencies=[Depends(auth_service.require_admin_role)],
+    status_code=status.HTTP_200_OK,
+)
+async def get_user_cache_stats() -> JSONResponse:
+    async def _get_user_cache_stats():
+        return user_service.get_user_cache_stats()
+
+    return await process_request(
+        get_entities_fn=_get_user_cache_stats,
+        status_code=status.HTTP_200_OK,
+        not_found_err_msg="Could not fetch user cache stats",
+    )
+
+
+@router.get(
+    "/hashing/stats",
+    description="Get the queue and timing counters of the password hashing pool",
+    dependencies=[Depends(auth_service.require_admin_role)],
+    status_code=status.HTTP_200_OK,
+)
+async def get_password_hashing_stats() -> JSONResponse:
+    async def _get_password_hashing_stats():
+        return hashing.get_stats()
+
+    return await process_request(
+        get_entities_fn=_get_password_hashing_stats,
+        status_code=status.HTTP_200_OK,
+        not_found_err_msg="Could not fetch password hashing stats",
+    )
+
+
 @router.patch(
     "/{user_id}/role",
     description="Update user role",
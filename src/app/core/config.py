@@ -29,6 +29,50 @@ class Settings(BaseSettings):
 
     PROJECT_NAME: str = "expenses-app"
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: Optional[float] = 60
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000
+
+    USER_CACHE_TTL_SECONDS: float = 60
+    USER_CACHE_MAXSIZE: int = 10_000
+
+    EXPENSE_NAME_CACHE_TTL_SECONDS: float = 300
+    EXPENSE_NAME_CACHE_MAXSIZE: int = 50_000
+    EXPENSE_NAME_CACHE_WARM_ON_LOGIN: bool = False
+    EXPENSE_NAME_CACHE_WARM_LIMIT: int = 100
+
+    CATEGORY_CACHE_TTL_SECONDS: float = 300
+    CATEGORY_CACHE_MAXSIZE: int = 10_000
+
+    ANALYSIS_TIMESERIES_MAX_BUCKETS: int = 1_000
+
+    METRICS_ENABLED: bool = True
+
+    SLOW_QUERY_LOG_PATH: Optional[str] = None
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 2**20
+    SLOW_QUERY_LOG_BACKUP_COUNT: int = 5
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = 300
+
+    PROFILING_ENABLED: bool = False
+    PROFILING_INTERVAL_SECONDS: float = 0.001
+    PROFILING_OUTPUT_DIR: str = "profiles"
+    PROFILING_TOP_FRAMES: int = 5
+
+    GEOCODING_NETWORK_FALLBACK: bool = False
+    TIMEZONE_CACHE_TTL_SECONDS: float = 86_400
+    TIMEZONE_CACHE_MAXSIZE: int = 4096
+
+    PASSWORD_HASHING_WORKERS: int = 2
+    PASSWORD_HASHING_MAX_PENDING: int = 64
+
     PYDEVD: bool = False
     PYDEVD_PORT: Optional[int] = None
     PYDEVD_HOST: Optional[str] = None
@@ -0,0 +1,376 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Request latency and the database queries of every request are recorded by
+MetricsMiddleware and the cursor events of the engine. Values that already live
+elsewhere, like the pool counts and the cache counters, are read when /metrics is
+scraped through callback metrics.
+
+Labels are kept low-cardinality: requests are labelled by route template, e.g.
+/api/v1/expenses/{expense_id}, never by raw path.
+
+The registry lives in the process. With several workers (run_server.py
+--production), every worker counts only its own requests and a scrape of /metrics
+is answered by whichever worker accepts it, so the series of different workers
+interleave and their counters appear to reset. Run one worker per container and
+scrape every container, or run the workers as separate processes on their own
+ports, when the metrics are needed.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, Optional
+
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_COUNT_BUCKETS: tuple[float, ...] = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "unmatched"
+
+_registry: list["Metric"] = []
+
+
+class Metric:
+    """
+    The base of the metric types: a name, a help text and label names.
+
+    Attributes:
+        name (str): The metric name.
+        documentation (str): The help text.
+        label_names (tuple[str, ...]): The names of the labels.
+    """
+
+    type_name = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: Iterable[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        _registry.append(self)
+
+    def samples(self) -> Iterable[tuple[str, LabelValues, float, str]]:
+        """
+        Get the samples of the metric.
+
+        Returns:
+            Iterable[tuple[str, LabelValues, float, str]]: The sample name suffix,
+                the label values, the value and an extra rendered label.
+        """
+        return ()
+
+    def render(self) -> list[str]:
+        """
+        Render the metric in the text exposition format.
+
+        Returns:
+            list[str]: The HELP and TYPE lines followed by one line per sample.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, label_values, value, extra_label in self.samples():
+            labels = [
+                f'{name}="{_escape(value_)}"'
+                for name, value_ in zip(self.label_names, label_values)
+            ]
+            if extra_label:
+                labels.append(extra_label)
+            rendered_labels = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{self.name}{suffix}{rendered_labels} {_format(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """
+    A monotonically increasing value per label set.
+    """
+
+    type_name = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: Iterable[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """
+        Increment the counter of a label set.
+
+        Args:
+            *label_values (str): The label values, in the order of the label names.
+            amount (float): The increment.
+        """
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[tuple[str, LabelValues, float, str]]:
+        return [("", labels, value, "") for labels, value in self._values.items()]
+
+
+class Histogram(Metric):
+    """
+    Observations counted in cumulative buckets per label set, with their sum.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value (float): The observed value.
+            *label_values (str): The label values, in the order of the label names.
+        """
+        counts = self._counts.get(label_values)
+        if counts is None:
+            counts = self._counts[label_values] = [0] * (len(self.buckets) + 1)
+        for index, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+        self._sums[label_values] = self._sums.get(label_values, 0.0) + value
+
+    def samples(self) -> Iterable[tuple[str, LabelValues, float, str]]:
+        for labels, counts in self._counts.items():
+            cumulative = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield "_bucket", labels, cumulative, f'le="{_format(upper_bound)}"'
+            yield "_sum", labels, self._sums[labels], ""
+            yield "_count", labels, cumulative, ""
+
+
+class CallbackMetric(Metric):
+    """
+    A gauge or counter whose values are read from a callback on every scrape.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Iterable[tuple[LabelValues, float]]],
+        label_names: Iterable[str] = (),
+        type_name: str = "gauge",
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.type_name = type_name
+        self._callback = callback
+
+    def samples(self) -> Iterable[tuple[str, LabelValues, float, str]]:
+        return [("", labels, value, "") for labels, value in self._callback()]
+
+
+class RequestStats:
+    """
+    The database work done while serving one request.
+
+    Attributes:
+        queries (int): The number of executed statements.
+        db_time (float): The seconds spent executing them.
+    """
+
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries",
+    "Database statements executed per HTTP request.",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing database statements per HTTP request.",
+    ("method", "route"),
+)
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time.",
+)
+
+
+def record_query(duration: float) -> None:
+    """
+    Record an executed database statement, also against the current request.
+
+    Args:
+        duration (float): The execution time in seconds.
+    """
+    db_query_duration_seconds.observe(duration)
+    stats: Optional[RequestStats] = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += duration
+
+
+@contextmanager
+def request_stats() -> Iterator[RequestStats]:
+    """
+    Get the database stats of the current request, tracking them from here on if
+    MetricsMiddleware does not.
+
+    Yields:
+        RequestStats: The stats of the current request.
+    """
+    stats: Optional[RequestStats] = _request_stats.get()
+    if stats is not None:
+        yield stats
+        return
+
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def render() -> bytes:
+    """
+    Render every registered metric.
+
+    Returns:
+        bytes: The metrics in the Prometheus text exposition format.
+    """
+    lines: list[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return ("\n".join(lines) + "\n").encode()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency and the database work of every request
+    under its route template.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def _send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with request_stats() as stats:
+            queries, db_time = stats.queries, stats.db_time
+            start = time.perf_counter()
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                duration = time.perf_counter() - start
+                queries, db_time = stats.queries - queries, stats.db_time - db_time
+
+                route = _route_template(scope)
+                method: str = scope["method"]
+                http_requests_total.inc(method, route, str(status_code))
+                http_request_duration_seconds.observe(duration, method, route)
+                http_request_db_queries.observe(queries, method, route)
+                http_request_db_seconds.observe(db_time, method, route)
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Get the template of the route that served a request, prefixes included.
+
+    Depending on the FastAPI version, a route of an included router knows either
+    its full path or only its path within the router. In the latter case, the path
+    it matched is cut off the end of the request path to find the prefix.
+
+    Args:
+        scope (Scope): The request scope.
+
+    Returns:
+        str: The route template, e.g. /api/v1/expenses/{expense_id}.
+    """
+    route: Optional[BaseRoute] = scope.get("route")
+    path_format: Optional[str] = getattr(route, "path_format", None)
+    if path_format is None:
+        return UNMATCHED_ROUTE
+
+    convertors: dict = getattr(route, "param_convertors", {})
+    matched_path = path_format
+    for name, value in scope.get("path_params", {}).items():
+        convertor = convertors.get(name)
+        matched_path = matched_path.replace(
+            f"{{{name}}}", convertor.to_string(value) if convertor else str(value)
+        )
+
+    path: str = scope["path"]
+    if path.endswith(matched_path):
+        return path[: len(path) - len(matched_path)] + path_format
+    return path_format
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
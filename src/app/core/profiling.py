@@ -0,0 +1,203 @@
+"""
+On-demand profiling of single requests.
+
+Requests sent by an admin with the X-Profile: 1 header are sampled with pyinstrument
+in async mode, so only the time spent on that request is attributed to it. The full
+profile is written as an interactive HTML flame graph to PROFILING_OUTPUT_DIR and a
+summary is returned in the response headers:
+
+    Server-Timing: total;dur=84.1, db;dur=61.3;desc="7 queries", app;dur=22.8
+    X-Profile-Id: 20261018-101500-GET-api_v1_expenses-3f2a9c1e
+    X-Profile-Top: _to_expense_response (app/services/expense_service.py:512) 4.2ms, ...
+
+pyinstrument is an optional dependency, installed with the profiling extra, the
+middleware is only installed when it can be imported.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import Settings, get_settings
+
+# Frame.is_synthetic and the [self] frames holding a function's own time need
+# pyinstrument 4.5 or newer, the version required by the profiling extra.
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.frame import SELF_TIME_FRAME_IDENTIFIER
+except ImportError:
+    Profiler = None
+
+settings: Settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_TOP_HEADER = b"x-profile-top"
+SERVER_TIMING_HEADER = b"server-timing"
+
+_UNSAFE_FILENAME_CHARACTERS = re.compile(r"[^\w-]+")
+
+
+def is_available() -> bool:
+    """
+    Check whether pyinstrument is installed.
+
+    Returns:
+        bool: True if requests can be profiled.
+    """
+    return Profiler is not None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling the requests of admins that ask for it with the
+    X-Profile: 1 header.
+
+    One request is profiled at a time per worker, others sent meanwhile are served
+    without profiling. The response is held back until the profile is written, so
+    that the summary can be added to its headers.
+    """
+
+    def __init__(
+        self, app: ASGIApp, authorize: Callable[[Request], Awaitable[bool]]
+    ) -> None:
+        self.app = app
+        self.authorize = authorize
+        self._output_dir = Path(settings.PROFILING_OUTPUT_DIR)
+        self._busy = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or Headers(scope=scope).get(PROFILE_HEADER) != "1"
+            or not await self.authorize(Request(scope))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if self._busy:
+            logger.info(f"A profile is already running, not profiling {scope['path']}")
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self._busy = False
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        messages: list[Message] = []
+
+        async def _send(message: Message) -> None:
+            messages.append(message)
+
+        profiler = Profiler(
+            interval=settings.PROFILING_INTERVAL_SECONDS, async_mode="enabled"
+        )
+        with metrics.request_stats() as stats:
+            queries, db_time = stats.queries, stats.db_time
+            start = time.perf_counter()
+            profiler.start()
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                profiler.stop()
+                duration = time.perf_counter() - start
+            queries, db_time = stats.queries - queries, stats.db_time - db_time
+
+        profile_id = _profile_id(scope)
+        top_frames: list[tuple[str, float]] = await asyncio.to_thread(
+            _write_profile, profiler, self._output_dir / f"{profile_id}.html"
+        )
+        logger.info(
+            f"Profiled {scope['method']} {scope['path']} in {duration * 1000:.1f} ms, "
+            f"{queries} queries in {db_time * 1000:.1f} ms: {profile_id}"
+        )
+
+        headers: list[tuple[bytes, bytes]] = [
+            (SERVER_TIMING_HEADER, _server_timing(duration, db_time, queries)),
+            (PROFILE_ID_HEADER, profile_id.encode()),
+            (
+                PROFILE_TOP_HEADER,
+                ", ".join(
+                    f"{label} {self_time * 1000:.1f}ms"
+                    for label, self_time in top_frames
+                ).encode("latin-1", "replace"),
+            ),
+        ]
+        for message in messages:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+
+def _profile_id(scope: Scope) -> str:
+    path: str = _UNSAFE_FILENAME_CHARACTERS.sub("_", scope["path"]).strip("_")
+    return (
+        f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{path}-"
+        f"{uuid.uuid4().hex[:8]}"
+    )
+
+
+def _server_timing(duration: float, db_time: float, queries: int) -> bytes:
+    return (
+        f"total;dur={duration * 1000:.1f}, "
+        f'db;dur={db_time * 1000:.1f};desc="{queries} queries", '
+        f"app;dur={max(duration - db_time, 0) * 1000:.1f}"
+    ).encode()
+
+
+def _write_profile(profiler: Any, path: Path) -> list[tuple[str, float]]:
+    """
+    Write the HTML output of a profile and find its most expensive functions.
+
+    Args:
+        profiler (Profiler): The stopped profiler.
+        path (Path): The file to write.
+
+    Returns:
+        list[tuple[str, float]]: Up to PROFILING_TOP_FRAMES functions and their
+            self time in seconds, time spent awaiting excluded.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(profiler.output_html(), encoding="utf-8")
+
+    root = profiler.last_session.root_frame() if profiler.last_session else None
+    self_times: dict[str, float] = {}
+    frames = [root] if root is not None else []
+    while frames:
+        frame = frames.pop()
+        frames.extend(frame.children)
+        # Synthetic frames, like [await] and [self], are not functions.
+        if frame.is_synthetic:
+            continue
+        self_time = _self_time(frame)
+        if self_time <= 0:
+            continue
+        label = f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+        self_times[label] = self_times.get(label, 0.0) + self_time
+
+    return sorted(self_times.items(), key=lambda item: item[1], reverse=True)[
+        : settings.PROFILING_TOP_FRAMES
+    ]
+
+
+def _self_time(frame: Any) -> float:
+    # Frame.total_self_time also counts the time of the [await] children, only the
+    # [self] children hold time spent in the function itself.
+    return frame.time - sum(
+        child.time
+        for child in frame.children
+        if child.identifier != SELF_TIME_FRAME_IDENTIFIER
+    )
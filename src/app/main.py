@@ -1,3 +1,5 @@
+import asyncio
+import logging
 from urllib.parse import urljoin
 from contextlib import asynccontextmanager
 
@@ -5,11 +7,17 @@ from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.api_v1.api import api_router
+from app.api.api_v1.routes import metrics_route
+from app.core import profiling
+from app.core.metrics import MetricsMiddleware
 from app.core.config import get_settings, Settings
+from app.services import auth_service
+from app.services.utils import hashing, timezones
 
-from app.sql_app.database import initialize_database
+from app.sql_app.database import engine, initialize_database
 
 settings: Settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 def _setup_cors(app: FastAPI) -> None:
@@ -27,6 +35,29 @@ def _setup_cors(app: FastAPI) -> None:
         )
 
 
+def _setup_metrics(app: FastAPI) -> None:
+    """
+    Record the request metrics and serve them on /metrics
+    """
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_route.router, tags=["Metrics"])
+        app.add_middleware(MetricsMiddleware)
+
+
+def _setup_profiling(app: FastAPI) -> None:
+    """
+    Profile the admin requests sent with the X-Profile: 1 header
+    """
+    if not settings.PROFILING_ENABLED:
+        return
+    if not profiling.is_available():
+        logger.warning("PROFILING_ENABLED is set but pyinstrument is not installed")
+        return
+    app.add_middleware(
+        profiling.ProfilingMiddleware, authorize=auth_service.is_admin_request
+    )
+
+
 def _create_app() -> FastAPI:
     app_ = FastAPI(
         title=settings.PROJECT_NAME,
@@ -48,8 +79,14 @@ async def lifespan(app: FastAPI):
     Context manager to handle the lifespan of the FastAPI application.
     """
     await initialize_database()
+    await asyncio.to_thread(timezones.get_gazetteer)
+    hashing.start_executor()
     yield
+    hashing.shutdown_executor()
+    await engine.dispose()
 
 
 app = _create_app()
+_setup_profiling(app)
+_setup_metrics(app)
 _setup_cors(app)
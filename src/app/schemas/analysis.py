@@ -0,0 +1,25 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class ExpenseTimeSeries(BaseModel):
+    """
+    A Pydantic model for the expenses of a user summed per time bucket.
+
+    The series are parallel arrays, the i-th total and count belong to the i-th
+    bucket. Buckets without expenses are included with zeros.
+
+    Attributes:
+        bucket (str): The bucket size, "day", "week" or "month".
+        timezone (str): The timezone the buckets are aligned to.
+        timestamps (list[date]): The first day of every bucket.
+        totals (list[float]): The sum of the amounts in every bucket.
+        counts (list[int]): The number of expenses in every bucket.
+    """
+
+    bucket: str
+    timezone: str
+    timestamps: list[date]
+    totals: list[float]
+    counts: list[int]
@@ -35,3 +35,17 @@ class CategoryCreate(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CategorySet(BaseModel):
+    """
+    The categories of the global catalogue or of one user, as cached in memory.
+
+    Attributes:
+        categories (list[CategoryResponse]): The categories listed to the user, with
+            the identifiers of the global or custom categories.
+        by_name (dict[str, CategoryResponse]): The expense categories by name.
+    """
+
+    categories: list[CategoryResponse] = []
+    by_name: dict[str, CategoryResponse] = {}
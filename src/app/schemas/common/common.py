@@ -32,6 +32,10 @@ class FilterOptions(BaseModel):
         time_period (str): The time period for grouping expenses.
         sort_by (str): The attribute to sort expenses by.
         order_by (str): The order to sort expenses by.
+        offset (int): The number of expenses to skip in offset pagination.
+        limit (int): The maximum number of expenses to return.
+        pagination (str): "offset" for offset/limit pages, "cursor" for keyset pages.
+        cursor (str | None): The next_cursor of the previous page in cursor pagination.
 
     """
 
@@ -46,6 +50,8 @@ class FilterOptions(BaseModel):
     order_by: Literal["asc", "desc"] = "desc"
     offset: int = 0
     limit: int = 10
+    pagination: Literal["offset", "cursor"] = "offset"
+    cursor: Optional[str] = None
 
 
 class ResponseMessage(BaseModel):
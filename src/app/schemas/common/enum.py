@@ -6,3 +6,9 @@ class TimePeriod(Enum):
     WEEK = "week"
     MONTH = "month"
     YEAR = "year"
+
+
+class TimeBucket(Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
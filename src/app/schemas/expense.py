@@ -1,14 +1,19 @@
 from datetime import datetime
-from typing import Optional
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, Optional, TypedDict
 from uuid import UUID
+from zoneinfo import ZoneInfo
 from dateutil import parser
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 import pytz
 
 from app.sql_app.expense.expense import Expense
 from app.sql_app.expense_name.expense_name import ExpenseName
 
+EXPENSE_BATCH_MAX_ITEMS = 5000
+
 
 class ExpenseResponse(BaseModel):
     """
@@ -78,6 +83,137 @@ class ExpenseResponse(BaseModel):
         )
 
 
+class ExpenseRecord(TypedDict):
+    """
+    The serialized form of an ExpenseResponse, built without model validation.
+    """
+
+    id: UUID
+    name: str
+    amount: float
+    category: str
+    date: str
+    created_at: str
+    updated_at: str
+    note: Optional[str]
+
+
+class ExpensePageRecord(TypedDict):
+    """
+    The serialized form of an ExpensePage, built without model validation.
+    """
+
+    items: list[ExpenseRecord]
+    next_cursor: Optional[str]
+
+
+# (id, name, amount, category, date, created_at, updated_at, note)
+ExpenseRow = tuple[UUID, str, Decimal, str, datetime, datetime, datetime, Optional[str]]
+
+_expense_records_adapter = TypeAdapter(list[ExpenseRecord])
+_expense_page_adapter = TypeAdapter(ExpensePageRecord)
+
+
+@lru_cache(maxsize=None)
+def get_zone(timezone: str) -> ZoneInfo:
+    """
+    Get a timezone by name, resolving every name once per process.
+
+    Args:
+        timezone (str): The IANA timezone name.
+
+    Returns:
+        ZoneInfo: The timezone.
+    """
+    return ZoneInfo(timezone)
+
+
+def _format_datetime(value: datetime) -> str:
+    """
+    Format a datetime as "%d-%m-%Y %H:%M" without going through strftime.
+    """
+    return (
+        f"{value.day:02d}-{value.month:02d}-{value.year} "
+        f"{value.hour:02d}:{value.minute:02d}"
+    )
+
+
+def to_expense_records(
+    rows: Iterable[ExpenseRow], timezone: str
+) -> list[ExpenseRecord]:
+    """
+    Build the serialized form of expenses from column tuples.
+
+    The output matches ExpenseResponse.create: the date is formatted as stored and
+    the timestamps are converted to the user's timezone.
+
+    Args:
+        rows (Iterable[ExpenseRow]): The expense column tuples.
+        timezone (str): The user's timezone.
+
+    Returns:
+        list[ExpenseRecord]: The expenses, ready to be dumped to JSON.
+    """
+    zone = get_zone(timezone)
+    return [
+        {
+            "id": expense_id,
+            "name": name,
+            "amount": float(amount),
+            "category": category,
+            "date": _format_datetime(date),
+            "created_at": _format_datetime(created_at.astimezone(zone)),
+            "updated_at": _format_datetime(updated_at.astimezone(zone)),
+            "note": note,
+        }
+        for expense_id, name, amount, category, date, created_at, updated_at, note in rows
+    ]
+
+
+def dump_expense_records(records: list[ExpenseRecord]) -> bytes:
+    """
+    Dump a list of expenses to JSON in one pass.
+
+    Args:
+        records (list[ExpenseRecord]): The expenses.
+
+    Returns:
+        bytes: The JSON array of the expenses.
+    """
+    return _expense_records_adapter.dump_json(records)
+
+
+def dump_expense_page(
+    records: list[ExpenseRecord], next_cursor: Optional[str]
+) -> bytes:
+    """
+    Dump a page of expenses to JSON in one pass, in the ExpensePage format.
+
+    Args:
+        records (list[ExpenseRecord]): The expenses on the page.
+        next_cursor (str | None): The cursor of the next page.
+
+    Returns:
+        bytes: The JSON object of the page.
+    """
+    return _expense_page_adapter.dump_json(
+        {"items": records, "next_cursor": next_cursor}
+    )
+
+
+class ExpensePage(BaseModel):
+    """
+    A Pydantic model for a page of expenses in cursor pagination.
+
+    Attributes:
+        items (list[ExpenseResponse]): The expenses on the page.
+        next_cursor (str | None): The cursor of the next page, None on the last page.
+    """
+
+    items: list[ExpenseResponse]
+    next_cursor: Optional[str] = None
+
+
 class ExpenseCreate(BaseModel):
     """
     A Pydantic model for creating an expense.
@@ -110,6 +246,60 @@ class ExpenseCreate(BaseModel):
         return parser.parse(date) if isinstance(date, str) else date
 
 
+class ExpenseBatchCreate(BaseModel):
+    """
+    A Pydantic model for creating expenses in bulk.
+
+    Every item is validated as an ExpenseCreate on its own, so invalid items are
+    reported individually instead of rejecting the whole batch.
+
+    Attributes:
+        items (list[dict]): The expenses to create, in the ExpenseCreate format.
+    """
+
+    items: list[dict[str, Any]] = Field(
+        min_length=1,
+        max_length=EXPENSE_BATCH_MAX_ITEMS,
+        examples=[
+            [
+                {
+                    "name": "Expense name",
+                    "amount": 100.0,
+                    "date": "01/01/2025 12:00",
+                    "category": "Category name",
+                    "note": "Expense description",
+                }
+            ]
+        ],
+    )
+
+
+class ExpenseBatchError(BaseModel):
+    """
+    A Pydantic model for an item of a batch that could not be created.
+
+    Attributes:
+        index (int): The position of the item in the batch.
+        error (str): Why the item was rejected.
+    """
+
+    index: int
+    error: str
+
+
+class ExpenseBatchResponse(BaseModel):
+    """
+    A Pydantic model for the result of a batch creation.
+
+    Attributes:
+        created (list[ExpenseResponse]): The created expenses, in batch order.
+        errors (list[ExpenseBatchError]): The rejected items.
+    """
+
+    created: list[ExpenseResponse]
+    errors: list[ExpenseBatchError]
+
+
 class ExpenseUpdate(BaseModel):
     """
     A Pydantic model for updating an expense.
@@ -151,12 +341,14 @@ class ExpenseNameDTO(BaseModel):
         category_id (UUID): The unique identifier of the associated category.
         user_id (UUID): The unique identifier of the user who created the expense name.
         name (str): The name of the expense.
+        category (str | None): The name of the associated category.
     """
 
     id: UUID
     category_id: UUID
     user_id: UUID
     name: str
+    category: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+
+
+class DatabaseHealth(BaseModel):
+    """
+    A Pydantic model for the health of the database connection pool.
+
+    Attributes:
+        status (str): "ok" if the database answered the ping.
+        latency_ms (float): The round trip time of the ping in milliseconds.
+        pool_size (int): The number of connections the pool keeps.
+        checked_in (int): The idle connections in the pool.
+        checked_out (int): The connections in use.
+        overflow (int): The connections opened beyond the pool size.
+        max_overflow (int): The maximum number of overflow connections.
+    """
+
+    status: str
+    latency_ms: float
+    pool_size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
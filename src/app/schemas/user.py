@@ -2,6 +2,9 @@ from datetime import datetime
 import re
 from typing import Optional
 from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import pytz
 from pydantic import BaseModel, field_validator, Field, EmailStr
 
 from app.sql_app.user.user import User
@@ -154,6 +157,17 @@ class UpdateUser(BaseModel):
     timezone: Optional[str] = Field(examples=["UTC"])
     password: Optional[str] = Field(examples=["Password_123!"])
 
+    @field_validator("timezone")
+    def validate_timezone(cls, value) -> Optional[str]:
+        if value is None:
+            return value
+        try:
+            ZoneInfo(value)
+            pytz.timezone(value)
+        except (ZoneInfoNotFoundError, ValueError, pytz.UnknownTimeZoneError):
+            raise ValueError(f"Unknown timezone: {value}")
+        return value
+
     @field_validator("password")
     def validate_password(cls, value) -> str:
         if not re.match(PASSWORD_REGEX, value):
@@ -7,14 +7,17 @@ from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import Settings, get_settings
 from app.schemas.common.application_error import ApplicationError
-from app.sql_app.database import get_db
+from app.sql_app.database import AsyncSessionLocal, get_db
 from app.schemas.user import UserLogin, UserResponse
 from app.schemas.common.common import Token
 from app.services.utils import utils as u, validators as v, processors as p
-from app.services import user_service
+from app.services.utils import hashing
+from app.services import expense_service, user_service
 
 
+settings: Settings = get_settings()
 logger = logging.getLogger(__name__)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -35,6 +38,8 @@ async def login(login_data: OAuth2PasswordRequestForm, db: AsyncSession) -> Resp
     )
 
     user_id: UUID = await _authenticate_user(user=user, db=db)
+    if settings.EXPENSE_NAME_CACHE_WARM_ON_LOGIN:
+        await expense_service.warm_expense_name_cache(user_id=user_id, db=db)
     data: dict = {"sub": str(user_id)}
     access_token: Token = u.create_access_token(data=data)
     response = JSONResponse({"msg": "Logged in."})
@@ -87,9 +92,14 @@ async def _authenticate_user(user: UserLogin, db: AsyncSession) -> UUID:
         )
 
     stored_password: str = user_db.password
-    if not u.verify_password(
-        password=user_db.password, hashed_password=stored_password
-    ):
+    try:
+        verified: bool = await hashing.verify_password(
+            password=user.password, hashed_password=stored_password
+        )
+    except ApplicationError as e:
+        raise HTTPException(status_code=e.data.status, detail=e.data.detail)
+
+    if not verified:
         logger.error(msg="Passwords do not match")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password"
@@ -212,8 +222,10 @@ async def get_current_user(
 
 async def require_admin_role(
     user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ) -> UserResponse:
-    if not user.is_admin:
+    # The role is read from the database, the user may come from the user cache.
+    if not await user_service.is_admin(user_id=user.id, db=db):
         logger.error(msg="User does not have admin role")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -221,3 +233,30 @@ async def require_admin_role(
         )
 
     return user
+
+
+async def is_admin_request(request: Request) -> bool:
+    """
+    Check whether a request carries the access token of an admin.
+
+    Used by middleware, which runs before the route dependencies.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        bool: True if the token is valid and belongs to an admin.
+    """
+    token_payload: Optional[str] = request.cookies.get("uId")
+    token_signature: Optional[str] = request.cookies.get("ATS")
+    if not token_payload or not token_signature:
+        return False
+
+    try:
+        payload: dict = u.verify_access_token(f"{token_payload}.{token_signature}")
+        user_id = UUID(payload.get("sub"))
+    except (HTTPException, TypeError, ValueError):
+        return False
+
+    async with AsyncSessionLocal() as db:
+        return await user_service.is_admin(user_id=user_id, db=db)
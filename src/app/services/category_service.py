@@ -1,21 +1,197 @@
 import logging
-from typing import Optional
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable, Optional
 from uuid import UUID
 
 from fastapi import status
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.category import CategoryCreate, CategoryResponse
+from app.core.config import Settings, get_settings
+from app.schemas.category import CategoryCreate, CategoryResponse, CategorySet
 from app.schemas.common.application_error import ApplicationError
 from app.schemas.user import UserResponse
+from app.services import user_service
 from app.services.utils import processors as p
+from app.services.utils.cache import TTLCache
 from app.sql_app.category.category import Category
 from app.sql_app.custom_category.custom_category import CustomCategory
 from app.sql_app.expense_category.expense_category import ExpenseCategory
 
+settings: Settings = get_settings()
 logger = logging.getLogger(__name__)
 
+GLOBAL_CATEGORIES_KEY = "global"
+UNIQUE_CUSTOM_CATEGORY = "unique_custom_category_per_user"
+
+
+class CategoryCatalogue:
+    """
+    The categories users pick from, kept in memory: the global categories and the
+    custom categories of every user, each loaded on first use.
+
+    The custom categories of a user are stored with the user's data_version they
+    were loaded at and are only served for that version. Every write of custom
+    categories bumps the data_version in its transaction, so a write made through any
+    worker is seen on the next request. The global categories are not written by the
+    application and expire after CATEGORY_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._entries: TTLCache[tuple[int, CategorySet]] = TTLCache(
+            maxsize=maxsize, ttl=ttl, name="category"
+        )
+
+    async def get_global(self, db: AsyncSession) -> CategorySet:
+        """
+        Get the global categories.
+
+        Args:
+            db (AsyncSession): The database session.
+
+        Returns:
+            CategorySet: The global categories.
+        """
+        return await self._get(
+            key=GLOBAL_CATEGORIES_KEY,
+            data_version=0,
+            load=partial(_load_global_categories, db=db),
+        )
+
+    async def get_custom(
+        self, user_id: UUID, data_version: int, db: AsyncSession
+    ) -> CategorySet:
+        """
+        Get the custom categories of a user.
+
+        Args:
+            user_id (UUID): The user's unique identifier.
+            data_version (int): The user's current data_version, read before the
+                categories could be.
+            db (AsyncSession): The database session.
+
+        Returns:
+            CategorySet: The user's custom categories.
+        """
+        return await self._get(
+            key=user_id,
+            data_version=data_version,
+            load=partial(_load_custom_categories, user_id=user_id, db=db),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get the catalogue counters.
+
+        Returns:
+            dict[str, Any]: The cache size, limits, hits and misses.
+        """
+        return self._entries.stats()
+
+    async def _get(
+        self,
+        key: Hashable,
+        data_version: int,
+        load: Callable[[], Awaitable[CategorySet]],
+    ) -> CategorySet:
+        entry: Optional[tuple[int, CategorySet]] = self._entries.get(key)
+        if entry is not None and entry[0] == data_version:
+            return entry[1]
+
+        # Loaded after data_version was read, the set is at least that recent.
+        category_set: CategorySet = await load()
+        self._entries.set(key, (data_version, category_set))
+        return category_set
+
+
+catalogue = CategoryCatalogue(
+    maxsize=settings.CATEGORY_CACHE_MAXSIZE, ttl=settings.CATEGORY_CACHE_TTL_SECONDS
+)
+
+
+async def _load_global_categories(db: AsyncSession) -> CategorySet:
+    """
+    Load the global categories and their expense categories.
+
+    Args:
+        db (AsyncSession): The database session.
+
+    Returns:
+        CategorySet: The global categories.
+    """
+    result = await db.execute(
+        select(Category.id, Category.name, ExpenseCategory.id).outerjoin(
+            ExpenseCategory, ExpenseCategory.global_category_id == Category.id
+        )
+    )
+    category_set = CategorySet()
+    listed: set[UUID] = set()
+    for category_id, name, expense_category_id in result.all():
+        if category_id not in listed:
+            listed.add(category_id)
+            category_set.categories.append(CategoryResponse(id=category_id, name=name))
+        if expense_category_id is not None:
+            category_set.by_name.setdefault(
+                name, CategoryResponse(id=expense_category_id, name=name)
+            )
+
+    logger.info(f"Loaded {len(category_set.categories)} global categories")
+    return category_set
+
+
+async def _load_custom_categories(user_id: UUID, db: AsyncSession) -> CategorySet:
+    """
+    Load the custom categories of a user and their expense categories.
+
+    Deleted custom categories are not listed, but expenses can still be filed
+    under them by name.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        db (AsyncSession): The database session.
+
+    Returns:
+        CategorySet: The user's custom categories.
+    """
+    result = await db.execute(
+        select(
+            CustomCategory.id,
+            CustomCategory.name,
+            CustomCategory.is_deleted,
+            ExpenseCategory.id,
+        )
+        .outerjoin(
+            ExpenseCategory, ExpenseCategory.custom_category_id == CustomCategory.id
+        )
+        .filter(CustomCategory.user_id == user_id)
+    )
+    category_set = CategorySet()
+    listed: set[UUID] = set()
+    for category_id, name, is_deleted, expense_category_id in result.all():
+        if not is_deleted and category_id not in listed:
+            listed.add(category_id)
+            category_set.categories.append(CategoryResponse(id=category_id, name=name))
+        if expense_category_id is not None:
+            category_set.by_name.setdefault(
+                name, CategoryResponse(id=expense_category_id, name=name)
+            )
+
+    logger.info(
+        f"Loaded {len(category_set.categories)} custom categories for user: {user_id}"
+    )
+    return category_set
+
+
+def get_catalogue_stats() -> dict[str, Any]:
+    """
+    Get the hit and miss counters of the category catalogue.
+
+    Returns:
+        dict[str, Any]: The catalogue cache counters.
+    """
+    return catalogue.stats()
+
 
 async def create_custom_category(
     user_id: UUID, name: str, db: AsyncSession
@@ -23,6 +199,10 @@ async def create_custom_category(
     """
     Create a category.
 
+    The unique constraint on the user's custom category names decides whether the
+    name is taken, a cached lookup could miss a category created through another
+    worker.
+
     Args:
         user_id (UUID): The identifier of the user creating the category.
         name (str): The category name.
@@ -30,66 +210,109 @@ async def create_custom_category(
 
     Returns:
         CategoryResponse: The created category.
+
+    Raises:
+        ApplicationError: If a global category or a custom category of the user
+            already has the name.
     """
 
-    existing_category: Optional[CategoryResponse] = await get_by_name(name=name, db=db)
-    if existing_category:
-        raise ApplicationError(
-            detail=f"Category with name {name} already exists",
-            status_code=status.HTTP_409_CONFLICT,
-        )
+    global_categories: CategorySet = await catalogue.get_global(db=db)
+    if name in global_categories.by_name:
+        raise _category_exists(name=name)
 
-    async def _create_category():
-        custom_category: CategoryResponse = await _create_custom_category(
-            name=name, user_id=user_id, db=db
+    async with p.unit_of_work(db=db):
+        custom_category_id: Optional[UUID] = await db.scalar(
+            pg_insert(CustomCategory.__table__)
+            .values(name=name, user_id=user_id, is_deleted=False)
+            .on_conflict_do_nothing(constraint=UNIQUE_CUSTOM_CATEGORY)
+            .returning(CustomCategory.__table__.c.id)
         )
+        if custom_category_id is None:
+            raise _category_exists(name=name)
+
+        logger.info(f"Created custom category: {name}")
         expense_category: CategoryResponse = await _create_expense_category(
-            new_category=custom_category, db=db
+            new_category=CategoryResponse(id=custom_category_id, name=name), db=db
         )
+        await user_service.bump_data_version(user_id=user_id, db=db)
 
-        return CategoryResponse(
-            id=expense_category.id,
-            name=expense_category.name,
-        )
+    return CategoryResponse(
+        id=expense_category.id,
+        name=expense_category.name,
+    )
 
-    return await p.process_db_transaction(
-        transaction_func=_create_category,
-        db=db,
+
+def _category_exists(name: str) -> ApplicationError:
+    return ApplicationError(
+        detail=f"Category with name {name} already exists",
+        status_code=status.HTTP_409_CONFLICT,
     )
 
 
-async def _create_custom_category(
-    user_id: UUID, name: str, db: AsyncSession
-) -> CategoryResponse:
+async def get_or_create_custom_categories(
+    user_id: UUID, names: set[str], db: AsyncSession
+) -> dict[str, UUID]:
     """
-    Create a Custom Category.
+    Get the expense categories of custom categories of a user, creating the missing
+    ones.
+
+    The custom categories are inserted with INSERT ... ON CONFLICT DO NOTHING, the
+    ones that already exist, created concurrently or deleted included, are read back
+    afterwards. Does not bump the user's data_version, the caller's write does.
 
     Args:
-        user_id (UUID): The identifier of the user creating the category.
-        name (str): The category name.
+        user_id (UUID): The user's unique identifier.
+        names (set[str]): The category names.
         db (AsyncSession): The database session.
 
     Returns:
-        CategoryResponse: The created category.
+        dict[str, UUID]: The expense category identifier of every name.
     """
+    result = await db.execute(
+        pg_insert(CustomCategory.__table__)
+        .values(
+            [
+                {"name": name, "user_id": user_id, "is_deleted": False}
+                for name in sorted(names)
+            ]
+        )
+        .on_conflict_do_nothing(constraint=UNIQUE_CUSTOM_CATEGORY)
+        .returning(CustomCategory.__table__.c.id, CustomCategory.__table__.c.name)
+    )
+    custom_categories = result.all()
+
+    category_ids: dict[str, UUID] = {}
+    if custom_categories:
+        result = await db.execute(
+            insert(ExpenseCategory.__table__)
+            .values(
+                [
+                    {"custom_category_id": custom_category_id, "name": name}
+                    for custom_category_id, name in custom_categories
+                ]
+            )
+            .returning(ExpenseCategory.__table__.c.name, ExpenseCategory.__table__.c.id)
+        )
+        category_ids.update(result.all())
+        logger.info(
+            f"Created {len(custom_categories)} custom categories for user: {user_id}"
+        )
 
-    async def _create():
-        category = CustomCategory(name=name, user_id=user_id)
-        logger.info(f"Creating custom category: {category.name}")
-        _ = category.id
-        db.add(category)
-        await db.commit()
-        await db.refresh(category)
-
-        return CategoryResponse(
-            id=category.id,
-            name=category.name,
+    existing = names - category_ids.keys()
+    if existing:
+        result = await db.execute(
+            select(CustomCategory.name, ExpenseCategory.id)
+            .join(
+                ExpenseCategory,
+                ExpenseCategory.custom_category_id == CustomCategory.id,
+            )
+            .filter(
+                CustomCategory.user_id == user_id, CustomCategory.name.in_(existing)
+            )
         )
+        category_ids.update(result.all())
 
-    return await p.process_db_transaction(
-        transaction_func=_create,
-        db=db,
-    )
+    return category_ids
 
 
 async def _create_expense_category(
@@ -106,53 +329,45 @@ async def _create_expense_category(
         CategoryResponse: The created category.
     """
 
-    async def _create():
+    async with p.unit_of_work(db=db):
         category = ExpenseCategory(
             custom_category_id=new_category.id, name=new_category.name
         )
         logger.info(f"Creating category: {category.name}")
         db.add(category)
-        await db.commit()
-        await db.refresh(category)
+        await db.flush()
 
         return CategoryResponse(
             id=category.id,
             name=category.name,
         )
 
-    return await p.process_db_transaction(
-        transaction_func=_create,
-        db=db,
-    )
-
 
-async def get_by_name(name: str, db: AsyncSession) -> Optional[CategoryResponse]:
+async def get_by_name(
+    name: str, user_id: UUID, data_version: int, db: AsyncSession
+) -> Optional[CategoryResponse]:
     """
-    Get a category by name.
+    Get a global category or a custom category of the user by name.
 
     Args:
         name (str): The category name.
+        user_id (UUID): The identifier of the user.
+        data_version (int): The user's current data_version.
         db (AsyncSession): The database session.
 
     Returns:
-        CategoryResponse | None: The category with the given name or None.
+        CategoryResponse | None: The expense category with the given name or None.
     """
-    result = await db.execute(
-        select(ExpenseCategory).filter(ExpenseCategory.name == name)
-    )
-
-    category = result.scalars().first()
+    global_categories: CategorySet = await catalogue.get_global(db=db)
+    category: Optional[CategoryResponse] = global_categories.by_name.get(name)
+    if category is None:
+        custom_categories: CategorySet = await catalogue.get_custom(
+            user_id=user_id, data_version=data_version, db=db
+        )
+        category = custom_categories.by_name.get(name)
 
     logger.info(f"Fetched category: {category.name if category else None}")
-
-    return (
-        CategoryResponse(
-            id=category.id,
-            name=category.name,
-        )
-        if category
-        else None
-    )
+    return category
 
 
 async def get_all(user: UserResponse, db: AsyncSession) -> list[CategoryResponse]:
@@ -166,19 +381,12 @@ async def get_all(user: UserResponse, db: AsyncSession) -> list[CategoryResponse
     Returns:
         list[CategoryResponse]: A list of all categories.
     """
-
-    result = await db.execute(
-        select(Category.id, Category.name).union(
-            select(CustomCategory.id, CustomCategory.name).filter(
-                CustomCategory.user_id == user.id, CustomCategory.is_deleted == False
-            )
-        )
+    data_version: int = await user_service.get_data_version(user_id=user.id, db=db)
+    global_categories: CategorySet = await catalogue.get_global(db=db)
+    custom_categories: CategorySet = await catalogue.get_custom(
+        user_id=user.id, data_version=data_version, db=db
     )
-
-    categories = result.all()
+    categories = global_categories.categories + custom_categories.categories
     logger.info(f"Fetched {len(categories)} categories")
 
-    return [
-        CategoryResponse(id=category_id, name=category_name)
-        for category_id, category_name in categories
-    ]
+    return categories
@@ -1,27 +1,45 @@
 import logging
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from uuid import UUID
 
-import pandas as pd
-
+from dateutil.relativedelta import relativedelta
+from fastapi import status
 from fastapi.responses import JSONResponse
-from sqlalchemy import select
+from sqlalchemy import DateTime, Select, bindparam, cast, func, literal_column, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.common.enum import TimePeriod
+from app.core.config import Settings, get_settings
+from app.schemas.analysis import ExpenseTimeSeries
+from app.schemas.common.application_error import ApplicationError
+from app.schemas.common.enum import TimeBucket, TimePeriod
+from app.schemas.expense import get_zone
 from app.services.utils import processors as p
-from app.services.expense_service import filter_by_time_period
+from app.services.expense_service import get_start_of_period
 from app.sql_app.expense.expense import Expense
+from app.sql_app.expense_category.expense_category import ExpenseCategory
+from app.sql_app.expense_daily_rollup.expense_daily_rollup import ExpenseDailyRollup
+from app.sql_app.expense_name.expense_name import ExpenseName
 
+settings: Settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# The span of a time series requested without a start: 30 days, 12 weeks or 12 months.
+DEFAULT_TIMESERIES_SPANS: dict[TimeBucket, relativedelta] = {
+    TimeBucket.DAY: relativedelta(days=29),
+    TimeBucket.WEEK: relativedelta(weeks=11),
+    TimeBucket.MONTH: relativedelta(months=11),
+}
+
 
 async def analyze_expenses_time_period(
-    user_id: int, time_period: TimePeriod, db: AsyncSession
+    user_id: UUID, time_period: TimePeriod, db: AsyncSession
 ) -> JSONResponse:
     """
     Get the total expenses for a user in a given time period.
 
     Args:
-        user_id (int): The user ID.
+        user_id (UUID): The user ID.
         time_period (TimePeriod): The time period.
         db (AsyncSession): The database session.
 
@@ -30,32 +48,229 @@ async def analyze_expenses_time_period(
     """
 
     async def _analyze_expenses():
-        query = select(Expense).filter(
-            Expense.user_id == user_id, Expense.is_deleted == False
-        )
-        query = await filter_by_time_period(query=query, time_period=time_period)
+        query = category_totals_query(user_id=user_id, time_period=time_period)
         result = await db.execute(query)
-        expenses: list[Expense] = result.scalars().unique()
-
-        expense_data = [
-            {
-                "date": expense.date,
-                "amount": float(expense.amount),
-                "category": expense.name.category.name,
-            }
-            for expense in expenses
+        category_expenses = [
+            {"category": category, "amount": float(amount)}
+            for category, amount in result.all()
         ]
-        df = pd.DataFrame(expense_data)
-
-        if df.empty:
-            return {"total_expenses": []}
-
-        category_expenses = df.groupby("category")["amount"].sum().reset_index()
+        logger.info(f"Aggregated {len(category_expenses)} categories for: {user_id}")
 
-        category_expenses = category_expenses.to_dict(orient="records")
         return {"total_expenses": category_expenses}
 
     return await p.process_db_transaction(
         transaction_func=_analyze_expenses,
         db=db,
     )
+
+
+def category_totals_query(user_id: UUID, time_period: TimePeriod) -> Select:
+    """
+    Build the query summing a user's expenses per category from the daily rollup.
+
+    Only one (category, amount) row per category leaves Postgres, and at most one
+    rollup row per category and day is read instead of every expense.
+
+    Args:
+        user_id (UUID): The user ID.
+        time_period (TimePeriod): The time period.
+
+    Returns:
+        Select: The aggregation query, ordered by category name.
+    """
+    query = (
+        select(ExpenseCategory.name, func.sum(ExpenseDailyRollup.total))
+        .select_from(ExpenseDailyRollup)
+        .join(
+            ExpenseCategory,
+            ExpenseDailyRollup.expense_category_id == ExpenseCategory.id,
+        )
+        .filter(ExpenseDailyRollup.user_id == user_id)
+    )
+
+    start_of_period: Optional[datetime] = get_start_of_period(time_period=time_period)
+    if start_of_period is not None:
+        query = query.filter(ExpenseDailyRollup.day >= start_of_period.date())
+
+    return (
+        query.group_by(ExpenseCategory.name)
+        .having(func.sum(ExpenseDailyRollup.count) > 0)
+        .order_by(ExpenseCategory.name)
+    )
+
+
+async def get_expense_timeseries(
+    user_id: UUID,
+    user_timezone: str,
+    bucket: TimeBucket,
+    start: Optional[date],
+    end: Optional[date],
+    category: Optional[str],
+    db: AsyncSession,
+) -> ExpenseTimeSeries:
+    """
+    Get the expenses of a user summed per day, week or month.
+
+    The buckets are aligned to the user's timezone, weeks start on Monday. The
+    bounds are whole days in the user's timezone, both included.
+
+    Args:
+        user_id (UUID): The user ID.
+        user_timezone (str): The user's timezone.
+        bucket (TimeBucket): The bucket size.
+        start (date | None): The first day, by default 30 days, 12 weeks or 12
+            months before the end.
+        end (date | None): The last day, by default today.
+        category (str | None): Only sum the expenses of the category with this name.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ExpenseTimeSeries: The totals and counts of every bucket.
+
+    Raises:
+        ApplicationError: If the start is after the end or the range has too many
+            buckets.
+    """
+    end = end or datetime.now(get_zone(user_timezone)).date()
+    start = start or end - DEFAULT_TIMESERIES_SPANS[bucket]
+    if start > end:
+        raise ApplicationError(
+            detail="The start of the time series must not be after its end.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+    if count_buckets(bucket=bucket, start=start, end=end) > (
+        settings.ANALYSIS_TIMESERIES_MAX_BUCKETS
+    ):
+        raise ApplicationError(
+            detail=(
+                "The time series must not have more than "
+                f"{settings.ANALYSIS_TIMESERIES_MAX_BUCKETS} buckets."
+            ),
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    async def _get_expense_timeseries():
+        query = timeseries_query(
+            user_id=user_id,
+            user_timezone=user_timezone,
+            bucket=bucket,
+            start=start,
+            end=end,
+            category=category,
+        )
+        result = await db.execute(query)
+        rows = result.all()
+        logger.info(f"Aggregated {len(rows)} {bucket.value} buckets for: {user_id}")
+
+        return ExpenseTimeSeries(
+            bucket=bucket.value,
+            timezone=user_timezone,
+            timestamps=[bucket_start.date() for bucket_start, _, _ in rows],
+            totals=[float(total) for _, total, _ in rows],
+            counts=[count for _, _, count in rows],
+        )
+
+    return await p.process_db_transaction(
+        transaction_func=_get_expense_timeseries,
+        db=db,
+    )
+
+
+def count_buckets(bucket: TimeBucket, start: date, end: date) -> int:
+    """
+    Count the buckets a time series from start to end has.
+
+    Args:
+        bucket (TimeBucket): The bucket size.
+        start (date): The first day.
+        end (date): The last day.
+
+    Returns:
+        int: The number of buckets.
+    """
+    match bucket:
+        case TimeBucket.DAY:
+            return (end - start).days + 1
+        case TimeBucket.WEEK:
+            return (end - (start - timedelta(days=start.weekday()))).days // 7 + 1
+        case TimeBucket.MONTH:
+            return (end.year - start.year) * 12 + end.month - start.month + 1
+
+
+def timeseries_query(
+    user_id: UUID,
+    user_timezone: str,
+    bucket: TimeBucket,
+    start: date,
+    end: date,
+    category: Optional[str],
+) -> Select:
+    """
+    Build the query summing a user's expenses per bucket in the user's timezone.
+
+    The expenses are grouped by date_trunc of their local date, the buckets come
+    from generate_series and are outer joined to the sums, so empty buckets are
+    returned with zeros by the same query.
+
+    Args:
+        user_id (UUID): The user ID.
+        user_timezone (str): The user's timezone.
+        bucket (TimeBucket): The bucket size.
+        start (date): The first day.
+        end (date): The last day.
+        category (str | None): Only sum the expenses of the category with this name.
+
+    Returns:
+        Select: The (bucket start, total, count) rows, ordered by bucket.
+    """
+    zone = get_zone(user_timezone)
+    # Inlined so the bucket expression renders the same in SELECT and GROUP BY.
+    unit = bindparam("unit", bucket.value, literal_execute=True)
+    local_date = func.timezone(
+        bindparam("timezone", user_timezone, literal_execute=True), Expense.date
+    )
+    bucket_start = func.date_trunc(unit, local_date)
+
+    totals = (
+        select(
+            bucket_start.label("bucket"),
+            func.sum(Expense.amount).label("total"),
+            func.count(Expense.id).label("count"),
+        )
+        .select_from(Expense)
+        .filter(
+            Expense.user_id == user_id,
+            Expense.is_deleted == False,
+            Expense.date >= datetime.combine(start, time(), tzinfo=zone),
+            Expense.date
+            < datetime.combine(end + timedelta(days=1), time(), tzinfo=zone),
+        )
+        .group_by(bucket_start)
+    )
+    if category is not None:
+        totals = (
+            totals.join(ExpenseName, Expense.name_id == ExpenseName.id)
+            .join(ExpenseCategory, ExpenseName.category_id == ExpenseCategory.id)
+            .filter(ExpenseCategory.name == category)
+        )
+    totals = totals.subquery()
+
+    series = (
+        func.generate_series(
+            func.date_trunc(unit, cast(datetime.combine(start, time()), DateTime)),
+            cast(datetime.combine(end, time()), DateTime),
+            literal_column(f"interval '1 {bucket.value}'"),
+        )
+        .table_valued("bucket")
+        .render_derived(name="series")
+    )
+
+    return (
+        select(
+            series.c.bucket,
+            func.coalesce(totals.c.total, 0),
+            func.coalesce(totals.c.count, 0),
+        )
+        .select_from(series.outerjoin(totals, totals.c.bucket == series.c.bucket))
+        .order_by(series.c.bucket)
+    )
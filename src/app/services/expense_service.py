@@ -1,60 +1,118 @@
+import base64
+import csv
+import io
+import json
 import logging
 
 from dateutil import parser
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from decimal import Decimal
+from functools import partial
+from typing import Any, AsyncIterator, Iterable, Literal, Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy import select, asc, desc
+import pytz
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select, update, asc, desc, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import status
 
+from app.core.config import Settings, get_settings
 from app.schemas.category import CategoryResponse
 from app.schemas.common.common import FilterOptions, ResponseMessage
 from app.schemas.common.enum import TimePeriod
 from app.schemas.expense import (
+    ExpenseBatchError,
+    ExpenseBatchResponse,
     ExpenseCreate,
     ExpenseResponse,
+    ExpenseRow,
     ExpenseNameDTO,
     ExpenseUpdate,
     Note,
+    dump_expense_page,
+    dump_expense_records,
+    to_expense_records,
 )
-from app.services import category_service
-from app.services.utils import validators as v, processors as p
+from app.services import category_service, rollup_service, user_service
+from app.services.utils import processors as p
+from app.services.utils.cache import TTLCache
 from app.schemas.common.application_error import ApplicationError
-from app.sql_app.category.category import Category
+from app.sql_app.database import AsyncSessionLocal
 from app.sql_app.expense.expense import Expense
+from app.sql_app.expense_category.expense_category import ExpenseCategory
 from app.sql_app.expense_name.expense_name import ExpenseName
+from app.sql_app.ids import uuid7
+from app.sql_app.load_profiles import LoadProfileName, load_profile
+from app.sql_app.user.user import User
 
+settings: Settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Expense names keyed by (user_id, name), looked up by every create and rename. Only
+# the category of a name changes once it exists: update_expense drops the entry on
+# this worker, a change made through another worker is seen here after at most
+# EXPENSE_NAME_CACHE_TTL_SECONDS. The cached category is therefore never written:
+# the rollup and the responses of writes use the category read by the rollup upsert.
+expense_name_cache: TTLCache[ExpenseNameDTO] = TTLCache(
+    maxsize=settings.EXPENSE_NAME_CACHE_MAXSIZE,
+    ttl=settings.EXPENSE_NAME_CACHE_TTL_SECONDS,
+    name="expense_name",
+)
+
+EXPORT_BATCH_SIZE = 1000
+EXPENSE_BATCH_INSERT_CHUNK = 1000
+EXPORT_FIELDS = (
+    "id",
+    "name",
+    "amount",
+    "category",
+    "date",
+    "created_at",
+    "updated_at",
+    "note",
+)
+EXPENSE_COLUMNS = (
+    Expense.id,
+    ExpenseName.name,
+    Expense.amount,
+    ExpenseCategory.name,
+    Expense.date,
+    Expense.created_at,
+    Expense.updated_at,
+    Expense.note,
+)
+
 
 async def get_user_expenses(
     user_id: UUID, filter_options: FilterOptions, db: AsyncSession
-) -> list[ExpenseResponse]:
+) -> bytes:
     """
     Get all expenses for a user with flag is_deleted == False.
 
+    The expenses are read as column tuples and serialized in one pass, the user's
+    timezone is looked up once for the whole list.
+
     Args:
         user_id (UUID): The user's unique identifier.
         filter_options (FilterOptions): The filter options for the expenses.
         db (AsyncSession): The database session.
 
     Returns:
-        List[ExpenseResponse]: A list of expenses for the user.
+        bytes: The JSON list of ExpenseResponse in offset pagination, or the JSON
+            ExpensePage with the next cursor in cursor pagination.
 
     Raises:
-        ApplicationError: If user with given ID does not exist.
+        ApplicationError: If user with given ID does not exist or the cursor is invalid.
     """
-    if not await v.user_exists(user_id=user_id, db=db):
-        logger.error(f"User not found: {user_id}")
-        raise ApplicationError(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found.",
-        )
+    user_timezone: str = await _get_user_timezone(user_id=user_id, db=db)
 
-    query = select(Expense).filter(
-        Expense.user_id == user_id, Expense.is_deleted == False
+    query = (
+        select(*EXPENSE_COLUMNS)
+        .join(ExpenseName, Expense.name_id == ExpenseName.id)
+        .join(ExpenseCategory, ExpenseName.category_id == ExpenseCategory.id)
+        .filter(Expense.user_id == user_id, Expense.is_deleted == False)
     )
 
     query = await filter_expenses(
@@ -68,6 +126,16 @@ async def get_user_expenses(
         sort_column = Expense.date
 
     order = asc if filter_options.order_by == "asc" else desc
+
+    if filter_options.pagination == "cursor" or filter_options.cursor:
+        return await _get_expenses_page(
+            query=query,
+            sort_column=sort_column,
+            filter_options=filter_options,
+            user_timezone=user_timezone,
+            db=db,
+        )
+
     query = (
         query.order_by(order(sort_column))
         .offset(filter_options.offset)
@@ -75,32 +143,292 @@ async def get_user_expenses(
     )
 
     result = await db.execute(query)
-    expenses: list[Expense] = result.scalars().unique()
+    rows: list[ExpenseRow] = result.all()
 
     logger.info(f"Fetched all expenses for user: {user_id}")
 
-    return [ExpenseResponse.create(expense=expense) for expense in expenses]
+    return dump_expense_records(to_expense_records(rows=rows, timezone=user_timezone))
+
+
+async def _get_expenses_page(
+    query: Any,
+    sort_column: Any,
+    filter_options: FilterOptions,
+    user_timezone: str,
+    db: AsyncSession,
+) -> bytes:
+    """
+    Get a page of expenses with keyset pagination.
+
+    The page starts right after the (sort value, id) tuple encoded in the cursor, so
+    every page costs the same regardless of its depth and is not shifted by inserts.
+
+    Args:
+        query (Any): The filtered expenses query.
+        sort_column (Any): The column the expenses are sorted by.
+        filter_options (FilterOptions): The filter options for the expenses.
+        user_timezone (str): The user's timezone.
+        db (AsyncSession): The database session.
+
+    Returns:
+        bytes: The JSON ExpensePage with the expenses and the cursor of the next one.
+    """
+    ascending = filter_options.order_by == "asc"
+    order = asc if ascending else desc
+
+    if filter_options.cursor:
+        last_value, last_id = _decode_cursor(
+            cursor=filter_options.cursor, filter_options=filter_options
+        )
+        position = tuple_(sort_column, Expense.id)
+        query = query.filter(
+            position > (last_value, last_id)
+            if ascending
+            else position < (last_value, last_id)
+        )
+
+    query = query.order_by(order(sort_column), order(Expense.id)).limit(
+        filter_options.limit + 1
+    )
+
+    result = await db.execute(query)
+    rows: list[ExpenseRow] = list(result.all())
+    logger.info(f"Fetched page of {len(rows)} expenses")
+
+    next_cursor: Optional[str] = None
+    if len(rows) > filter_options.limit:
+        rows = rows[: filter_options.limit]
+        next_cursor = _encode_cursor(row=rows[-1], filter_options=filter_options)
+
+    return dump_expense_page(
+        records=to_expense_records(rows=rows, timezone=user_timezone),
+        next_cursor=next_cursor,
+    )
+
+
+def _encode_cursor(row: ExpenseRow, filter_options: FilterOptions) -> str:
+    """
+    Encode the position of an expense as an opaque cursor.
+
+    Args:
+        row (ExpenseRow): The last expense of a page.
+        filter_options (FilterOptions): The filter options of the page.
+
+    Returns:
+        str: The URL-safe cursor.
+    """
+    expense_id, _, amount, _, date, *_ = row
+    value = str(amount) if filter_options.sort_by == "amount" else date.isoformat()
+    payload = {
+        "sort_by": filter_options.sort_by,
+        "order_by": filter_options.order_by,
+        "value": value,
+        "id": str(expense_id),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_cursor(cursor: str, filter_options: FilterOptions) -> tuple[Any, UUID]:
+    """
+    Decode a cursor into the (sort value, id) tuple of the last expense of a page.
+
+    Args:
+        cursor (str): The cursor to decode.
+        filter_options (FilterOptions): The filter options of the requested page.
+
+    Returns:
+        tuple[Any, UUID]: The sort value and the id of the last expense.
+
+    Raises:
+        ApplicationError: If the cursor is malformed or was issued for another sort order.
+    """
+    try:
+        payload: dict = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        sort_order = (payload["sort_by"], payload["order_by"])
+        last_id = UUID(payload["id"])
+        last_value = (
+            Decimal(payload["value"])
+            if payload["sort_by"] == "amount"
+            else datetime.fromisoformat(payload["value"])
+        )
+    except (ValueError, KeyError, TypeError, ArithmeticError):
+        logger.error(f"Invalid cursor: {cursor}")
+        raise ApplicationError(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        )
+
+    if sort_order != (filter_options.sort_by, filter_options.order_by):
+        raise ApplicationError(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match the requested sort_by and order_by.",
+        )
+
+    return last_value, last_id
+
+
+async def export_expenses(
+    user_id: UUID,
+    filter_options: FilterOptions,
+    export_format: Literal["csv", "ndjson"],
+) -> AsyncIterator[str]:
+    """
+    Export all expenses of a user matching the filter options.
+
+    The rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE
+    and serialized straight from the column tuples, so memory use does not grow
+    with the number of expenses. The stream uses its own session because it
+    outlives the request handler.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        filter_options (FilterOptions): The filter options for the expenses, the
+            pagination options are ignored.
+        export_format (str): "csv" or "ndjson".
+
+    Returns:
+        AsyncIterator[str]: The chunks of the export.
+
+    Raises:
+        ApplicationError: If the filter options are invalid, before anything is
+            streamed.
+    """
+    query = (
+        select(*EXPENSE_COLUMNS)
+        .join(ExpenseName, Expense.name_id == ExpenseName.id)
+        .join(ExpenseCategory, ExpenseName.category_id == ExpenseCategory.id)
+        .filter(Expense.user_id == user_id, Expense.is_deleted == False)
+    )
+    query = await filter_expenses(
+        user_id=user_id, query=query, filter_options=filter_options, db=None
+    )
+
+    sort_column = Expense.amount if filter_options.sort_by == "amount" else Expense.date
+    order = asc if filter_options.order_by == "asc" else desc
+    query = query.order_by(order(sort_column), order(Expense.id)).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+
+    async def _stream() -> AsyncIterator[str]:
+        if export_format == "csv":
+            yield _rows_to_csv([EXPORT_FIELDS])
+
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query)
+            exported = 0
+            async for rows in result.partitions():
+                exported += len(rows)
+                yield (
+                    _rows_to_csv(rows)
+                    if export_format == "csv"
+                    else _rows_to_ndjson(rows)
+                )
+
+        logger.info(f"Exported {exported} expenses for user: {user_id}")
+
+    return _stream()
+
+
+def _rows_to_csv(rows: Iterable[Sequence[Any]]) -> str:
+    """
+    Serialize expense column tuples as CSV lines.
+
+    Args:
+        rows (Iterable[Sequence[Any]]): The rows, in the order of EXPORT_FIELDS.
+
+    Returns:
+        str: The CSV lines.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_format_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _rows_to_ndjson(rows: Iterable[Sequence[Any]]) -> str:
+    """
+    Serialize expense column tuples as newline-delimited JSON objects.
+
+    Args:
+        rows (Iterable[Sequence[Any]]): The rows, in the order of EXPORT_FIELDS.
+
+    Returns:
+        str: The JSON lines.
+    """
+    return "".join(
+        json.dumps(
+            {
+                field: _format_export_value(value)
+                for field, value in zip(EXPORT_FIELDS, row)
+            }
+        )
+        + "\n"
+        for row in rows
+    )
+
+
+def _format_export_value(value: Any) -> Any:
+    """
+    Convert a column value to its textual export representation.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def _parse_filter_date(value: str, field: str) -> datetime:
+    """
+    Parse a date of the filter options.
+
+    Args:
+        value (str): The date as sent by the client.
+        field (str): The name of the filter option, for the error message.
+
+    Returns:
+        datetime: The parsed date.
+
+    Raises:
+        ApplicationError: If the date cannot be parsed.
+    """
+    try:
+        return parser.parse(value)
+    except (ValueError, OverflowError):
+        raise ApplicationError(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {field}: {value}",
+        )
 
 
 async def filter_expenses(
     user_id: UUID, query: Any, filter_options: FilterOptions, db: AsyncSession
 ) -> Any:
+    """
+    Apply the filter options to an expenses query.
+
+    The name and category filters compare the joined expense_name and
+    expense_category columns, so the query must already join both tables. Plain
+    joins let Postgres use the trigram indexes for the ILIKE substring searches,
+    which correlated EXISTS subqueries cannot.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        query (Any): The query joining Expense, ExpenseName and ExpenseCategory.
+        filter_options (FilterOptions): The filter options for the expenses.
+        db (AsyncSession): The database session.
+
+    Returns:
+        Any: The filtered query.
+
+    Raises:
+        ApplicationError: If start_date or end_date cannot be parsed.
+    """
     if filter_options.expense_name:
-        query = query.filter(
-            Expense.name.has(
-                ExpenseName.name.ilike(f"%{filter_options.expense_name}%")
-            ),
-            Expense.user_id == user_id,
-        )
+        query = query.filter(ExpenseName.name.ilike(f"%{filter_options.expense_name}%"))
 
     if filter_options.category:
-        query = query.filter(
-            Expense.name.has(
-                ExpenseName.category.has(
-                    Category.name.ilike(f"%{filter_options.category}%")
-                )
-            )
-        )
+        query = query.filter(ExpenseCategory.name.ilike(f"%{filter_options.category}%"))
 
     if filter_options.min_amount is not None:
         query = query.filter(Expense.amount >= filter_options.min_amount)
@@ -109,9 +437,16 @@ async def filter_expenses(
         query = query.filter(Expense.amount <= filter_options.max_amount)
 
     if filter_options.start_date:
-        start_date: datetime = parser.parse(filter_options.start_date)
+        start_date: datetime = _parse_filter_date(
+            value=filter_options.start_date, field="start_date"
+        )
         query = query.filter(Expense.date >= start_date)
-        return query.filter(Expense.date <= filter_options.end_date)
+        if filter_options.end_date:
+            end_date: datetime = _parse_filter_date(
+                value=filter_options.end_date, field="end_date"
+            )
+            query = query.filter(Expense.date <= end_date)
+        return query
 
     if filter_options.time_period:
         query = await filter_by_time_period(
@@ -132,23 +467,36 @@ async def filter_by_time_period(query: Any, time_period: TimePeriod) -> Any:
     Returns:
         Any: The filtered query.
     """
-    now = datetime.now()
+    start_of_period: Optional[datetime] = get_start_of_period(time_period=time_period)
+
+    if start_of_period is not None:
+        query = query.filter(Expense.date >= start_of_period)
+
+    return query
+
+
+def get_start_of_period(time_period: TimePeriod) -> Optional[datetime]:
+    """
+    Get the moment a time period starts at.
+
+    Args:
+        time_period (TimePeriod): The time period.
+
+    Returns:
+        datetime | None: The start of the time period, or None if it is unbounded.
+    """
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
     match time_period:
         case TimePeriod.DAY:
-            start_of_period = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            return today
         case TimePeriod.WEEK:
-            start_of_period = now - timedelta(days=now.weekday())
+            return today - timedelta(days=today.weekday())
         case TimePeriod.MONTH:
-            start_of_period = now.replace(day=1)
+            return today.replace(day=1)
         case TimePeriod.YEAR:
-            start_of_period = now.replace(month=1, day=1)
+            return today.replace(month=1, day=1)
         case _:
-            start_of_period = None
-
-    if start_of_period is not None:
-        query = query.filter(Expense.date >= start_of_period)
-
-    return query
+            return None
 
 
 async def create_expense(
@@ -165,28 +513,280 @@ async def create_expense(
     Returns:
         ExpenseResponse: The created expense.
     """
-    category: CategoryResponse = await _validate_data(
-        user_id=user_id, category_name=expense.category, db=db
-    )
-
-    async def _create():
+    async with p.unit_of_work(db=db):
+        user_timezone, data_version = await _get_user_timezone_and_data_version(
+            user_id=user_id, db=db
+        )
+        category: CategoryResponse = await _get_category(
+            user_id=user_id,
+            category_name=expense.category,
+            data_version=data_version,
+            db=db,
+        )
         expense_name: ExpenseNameDTO = await _get_expense_name(
-            user_id=user_id, expense_name=expense.name, category_id=category.id, db=db
+            user_id=user_id,
+            expense_name=expense.name,
+            category=category,
+            db=db,
         )
         logger.info(f"Fetched expense_name: {expense_name}")
         new_expense: ExpenseResponse = await _create_expense(
-            expense=expense, expense_name=expense_name, db=db
+            expense=expense,
+            expense_name=expense_name,
+            user_timezone=user_timezone,
+            db=db,
         )
-        return new_expense
+        await user_service.bump_data_version(user_id=user_id, db=db)
 
-    return await p.process_db_transaction(
-        transaction_func=_create,
-        db=db,
+    return new_expense
+
+
+async def create_expenses_batch(
+    user_id: UUID, items: list[dict[str, Any]], db: AsyncSession
+) -> ExpenseBatchResponse:
+    """
+    Create many expenses in one transaction.
+
+    Every item is validated on its own and invalid items are reported without
+    failing the batch. Categories and expense names are resolved with set-based
+    queries, the expenses are written with multi-row inserts of up to
+    EXPENSE_BATCH_INSERT_CHUNK rows and the transaction is committed once.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        items (list[dict[str, Any]]): The expenses to create, in the ExpenseCreate format.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ExpenseBatchResponse: The created expenses and the rejected items.
+
+    Raises:
+        ApplicationError: If user with given ID does not exist.
+    """
+    expenses: list[ExpenseCreate] = []
+    errors: list[ExpenseBatchError] = []
+    for index, item in enumerate(items):
+        try:
+            expenses.append(ExpenseCreate.model_validate(item))
+        except ValidationError as ex:
+            errors.append(
+                ExpenseBatchError(index=index, error=_format_validation_error(ex))
+            )
+
+    user_timezone, data_version = await _get_user_timezone_and_data_version(
+        user_id=user_id, db=db
     )
 
+    async def _create():
+        if not expenses:
+            return ExpenseBatchResponse(created=[], errors=errors)
+
+        category_ids: dict[str, UUID] = await _get_categories_batch(
+            user_id=user_id,
+            category_names={expense.category for expense in expenses},
+            data_version=data_version,
+            db=db,
+        )
+        expense_names: dict[
+            str, tuple[UUID, UUID, str]
+        ] = await _get_expense_names_batch(
+            user_id=user_id,
+            new_names={
+                expense.name: (category_ids[expense.category], expense.category)
+                for expense in reversed(expenses)
+            },
+            db=db,
+        )
+
+        rows = [
+            {
+                "id": uuid7(),
+                "name_id": expense_names[expense.name][0],
+                "user_id": user_id,
+                "date": expense.date,
+                "amount": expense.amount,
+                "note": expense.note,
+                "is_deleted": False,
+            }
+            for expense in expenses
+        ]
+        # 7 binds per row, chunks stay below the 32767 bind parameters of a statement.
+        timestamps: dict[UUID, tuple[datetime, datetime]] = {}
+        for offset in range(0, len(rows), EXPENSE_BATCH_INSERT_CHUNK):
+            result = await db.execute(
+                insert(Expense.__table__)
+                .values(rows[offset : offset + EXPENSE_BATCH_INSERT_CHUNK])
+                .returning(
+                    Expense.__table__.c.id,
+                    Expense.__table__.c.created_at,
+                    Expense.__table__.c.updated_at,
+                )
+            )
+            timestamps.update(
+                (row.id, (row.created_at, row.updated_at)) for row in result
+            )
+
+        await rollup_service.apply_deltas(
+            user_id=user_id,
+            deltas=[
+                (expense_names[expense.name][1], expense.date, expense.amount)
+                for expense in expenses
+            ],
+            db=db,
+        )
+        await user_service.bump_data_version(user_id=user_id, db=db)
+        logger.info(f"Created {len(rows)} expenses for user: {user_id}")
+
+        created = [
+            _to_expense_response(
+                expense=Expense(
+                    id=row["id"],
+                    amount=row["amount"],
+                    date=row["date"],
+                    note=row["note"],
+                    created_at=timestamps[row["id"]][0],
+                    updated_at=timestamps[row["id"]][1],
+                ),
+                name=expense.name,
+                category=expense_names[expense.name][2],
+                user_timezone=user_timezone,
+            )
+            for expense, row in zip(expenses, rows)
+        ]
+        return ExpenseBatchResponse(created=created, errors=errors)
+
+    async with p.unit_of_work(db=db):
+        return await _create()
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """
+    Format a validation error of a batch item as a single line.
+
+    Args:
+        error (ValidationError): The validation error.
+
+    Returns:
+        str: The "field: message" pairs of the error, separated by semicolons.
+    """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+async def _get_categories_batch(
+    user_id: UUID, category_names: set[str], data_version: int, db: AsyncSession
+) -> dict[str, UUID]:
+    """
+    Resolve category names to expense categories, creating the missing ones as
+    custom categories of the user.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        category_names (set[str]): The category names.
+        data_version (int): The user's current data_version.
+        db (AsyncSession): The database session.
+
+    Returns:
+        dict[str, UUID]: The expense category identifier of every name.
+    """
+    category_ids: dict[str, UUID] = {}
+    for name in category_names:
+        category: Optional[CategoryResponse] = await category_service.get_by_name(
+            name=name, user_id=user_id, data_version=data_version, db=db
+        )
+        if category is not None:
+            category_ids[name] = category.id
+
+    missing: set[str] = category_names - category_ids.keys()
+    if missing:
+        category_ids.update(
+            await category_service.get_or_create_custom_categories(
+                user_id=user_id, names=missing, db=db
+            )
+        )
+
+    return category_ids
+
+
+async def _get_expense_names_batch(
+    user_id: UUID, new_names: dict[str, tuple[UUID, str]], db: AsyncSession
+) -> dict[str, tuple[UUID, UUID, str]]:
+    """
+    Resolve expense names of a user, inserting the missing ones.
+
+    Existing names keep their category, like in _get_expense_name. They are read
+    FOR SHARE, so their category cannot change before the rollup deltas of the batch
+    are applied. Missing names are inserted with INSERT ... ON CONFLICT DO NOTHING,
+    and names inserted concurrently by another transaction are read back afterwards.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        new_names (dict[str, tuple[UUID, str]]): The expense category identifier and
+            name to use for every expense name that does not exist yet.
+        db (AsyncSession): The database session.
+
+    Returns:
+        dict[str, tuple[UUID, UUID, str]]: The expense name identifier, expense category
+            identifier and category name of every expense name.
+    """
+
+    async def _select(names) -> dict[str, tuple[UUID, UUID, str]]:
+        result = await db.execute(
+            select(
+                ExpenseName.name,
+                ExpenseName.id,
+                ExpenseName.category_id,
+                ExpenseCategory.name,
+            )
+            .join(ExpenseCategory, ExpenseName.category_id == ExpenseCategory.id)
+            .filter(ExpenseName.user_id == user_id, ExpenseName.name.in_(names))
+            .with_for_update(read=True, of=ExpenseName)
+        )
+        found: dict[str, tuple[UUID, UUID, str]] = {}
+        for name, name_id, category_id, category_name in result.all():
+            found.setdefault(name, (name_id, category_id, category_name))
+        return found
+
+    expense_names = await _select(new_names.keys())
+
+    missing = [name for name in new_names if name not in expense_names]
+    if missing:
+        result = await db.execute(
+            pg_insert(ExpenseName.__table__)
+            .values(
+                [
+                    {
+                        "name": name,
+                        "user_id": user_id,
+                        "category_id": new_names[name][0],
+                    }
+                    for name in missing
+                ]
+            )
+            .on_conflict_do_nothing(
+                constraint="unique_expense_name_per_user_and_category"
+            )
+            .returning(
+                ExpenseName.__table__.c.name,
+                ExpenseName.__table__.c.id,
+                ExpenseName.__table__.c.category_id,
+            )
+        )
+        for name, name_id, category_id in result.all():
+            expense_names[name] = (name_id, category_id, new_names[name][1])
+
+        conflicting = [name for name in missing if name not in expense_names]
+        if conflicting:
+            expense_names.update(await _select(conflicting))
+        logger.info(f"Created {len(missing)} expense names for user: {user_id}")
+
+    return expense_names
+
 
 async def _get_expense_name(
-    user_id: UUID, expense_name: str, category_id: UUID, db: AsyncSession
+    user_id: UUID, expense_name: str, category: CategoryResponse, db: AsyncSession
 ) -> ExpenseNameDTO:
     """
     Get the expense name.
@@ -194,11 +794,11 @@ async def _get_expense_name(
     Args:
         user_id (UUID): The user's unique identifier.
         expense_name (str): The name of the expense.
-        category_id (UUID): The category ID of the expense.
+        category (CategoryResponse): The category of a newly created expense name.
         db (AsyncSession): The database session.
 
     Returns:
-        ExpenseNameDTO: The expense name.
+        ExpenseNameDTO: The expense name with the name of its category.
     """
     existing_expense_name: Optional[ExpenseNameDTO] = await _find_expense_name(
         user_id=user_id, name=expense_name, db=db
@@ -207,27 +807,34 @@ async def _get_expense_name(
         existing_expense_name
         if existing_expense_name is not None
         else await _create_expense_name(
-            user_id=user_id, name=expense_name, category_id=category_id, db=db
+            user_id=user_id, name=expense_name, category=category, db=db
         )
     )
 
 
 async def _create_expense(
-    expense: ExpenseCreate, expense_name: ExpenseNameDTO, db: AsyncSession
+    expense: ExpenseCreate,
+    expense_name: ExpenseNameDTO,
+    user_timezone: str,
+    db: AsyncSession,
 ) -> ExpenseResponse:
     """
     Create an expense.
 
+    The id and the timestamps are returned by the INSERT and the category by the
+    rollup upsert, the response is built without reading the expense back.
+
     Args:
         expense (ExpenseCreate): The expense to create.
         expense_name (ExpenseNameDTO): The expense name to create.
+        user_timezone (str): The user's timezone.
         db (AsyncSession): The database session.
 
     Returns:
         ExpenseResponse: The created expense.
     """
 
-    async def _create():
+    async with p.unit_of_work(db=db):
         new_expense = Expense(
             name_id=expense_name.id,
             user_id=expense_name.user_id,
@@ -235,15 +842,56 @@ async def _create_expense(
             amount=expense.amount,
             note=expense.note,
         )
-        logger.info(f"Creating expense: {new_expense.id}")
         db.add(new_expense)
-        await db.commit()
-        await db.refresh(new_expense)
-        return ExpenseResponse.create(expense=new_expense)
+        await db.flush()
+        logger.info(f"Creating expense: {new_expense.id}")
+        # The cached expense name may predate a change of its category made through
+        # another worker, the category is the one the rollup upsert reads.
+        _, category_name = await rollup_service.apply_expense_name_delta(
+            user_id=expense_name.user_id,
+            expense_name_id=expense_name.id,
+            expense_date=expense.date,
+            amount=expense.amount,
+            count=1,
+            db=db,
+        )
+        return _to_expense_response(
+            expense=new_expense,
+            name=expense_name.name,
+            category=category_name,
+            user_timezone=user_timezone,
+        )
 
-    return await p.process_db_transaction(
-        transaction_func=_create,
-        db=db,
+
+def _to_expense_response(
+    expense: Expense, name: str, category: str, user_timezone: str
+) -> ExpenseResponse:
+    """
+    Build the response of a written expense from its flushed state.
+
+    Args:
+        expense (Expense): The flushed expense.
+        name (str): The expense name.
+        category (str): The name of the expense category.
+        user_timezone (str): The user's timezone.
+
+    Returns:
+        ExpenseResponse: The expense.
+    """
+    user_tz = pytz.timezone(user_timezone)
+    return ExpenseResponse(
+        id=expense.id,
+        name=name,
+        amount=expense.amount,
+        category=category,
+        date=(
+            expense.date.astimezone(pytz.utc)
+            if expense.date.tzinfo is not None
+            else expense.date
+        ),
+        created_at=expense.created_at.astimezone(user_tz).strftime("%d-%m-%Y %H:%M"),
+        updated_at=expense.updated_at.astimezone(user_tz).strftime("%d-%m-%Y %H:%M"),
+        note=expense.note,
     )
 
 
@@ -259,30 +907,38 @@ async def _find_expense_name(
         db (AsyncSession): The database session.
 
     Returns:
-        ExpenseNameDTO | None: The expense name if found, otherwise None.
+        ExpenseNameDTO | None: The expense name with the name of its category if
+            found, otherwise None.
     """
+    cached_expense_name: Optional[ExpenseNameDTO] = expense_name_cache.get(
+        (user_id, name)
+    )
+    if cached_expense_name is not None:
+        return cached_expense_name
 
     result = await db.execute(
-        select(ExpenseName).filter(
-            ExpenseName.name == name, ExpenseName.user_id == user_id
-        )
-    )
-    expense_name: Optional[ExpenseName] = result.scalars().first()
-    logger.info(f"Fetched expense_name: {expense_name}")
-    return (
-        ExpenseNameDTO(
-            id=expense_name.id,
-            category_id=expense_name.category_id,
-            user_id=expense_name.user_id,
-            name=expense_name.name,
+        select(
+            ExpenseName.id,
+            ExpenseName.category_id,
+            ExpenseName.user_id,
+            ExpenseName.name,
+            ExpenseCategory.name.label("category"),
         )
-        if expense_name
-        else None
+        .join(ExpenseCategory, ExpenseName.category_id == ExpenseCategory.id)
+        .filter(ExpenseName.name == name, ExpenseName.user_id == user_id)
     )
+    row = result.mappings().first()
+    logger.info(f"Fetched expense_name: {row['id'] if row else None}")
+    if row is None:
+        return None
+
+    expense_name = ExpenseNameDTO(**row)
+    _cache_expense_name(expense_name=expense_name, db=db)
+    return expense_name
 
 
 async def _create_expense_name(
-    user_id: UUID, name: str, category_id: UUID, db: AsyncSession
+    user_id: UUID, name: str, category: CategoryResponse, db: AsyncSession
 ) -> ExpenseNameDTO:
     """
     Create a new expense name.
@@ -290,91 +946,196 @@ async def _create_expense_name(
     Args:
         user_id (UUID): The user's unique identifier.
         name (str): The name of the expense.
-        category_id (UUID): The category's unique identifier.
+        category (CategoryResponse): The category of the expense name.
         db (AsyncSession): The database session.
 
     Returns:
         ExpenseNameDTO: The created expense name.
     """
 
-    async def _create():
+    async with p.unit_of_work(db=db):
         new_expense_name = ExpenseName(
-            category_id=category_id, user_id=user_id, name=name
+            category_id=category.id, user_id=user_id, name=name
         )
         logger.info(f"Creating expense_name: {new_expense_name.name}")
         db.add(new_expense_name)
-        await db.commit()
-        await db.refresh(new_expense_name)
-        return ExpenseNameDTO(
+        await db.flush()
+        expense_name = ExpenseNameDTO(
             id=new_expense_name.id,
             category_id=new_expense_name.category_id,
             user_id=new_expense_name.user_id,
             name=new_expense_name.name,
+            category=category.name,
         )
+        _cache_expense_name(expense_name=expense_name, db=db)
+        return expense_name
+
 
-    return await p.process_db_transaction(
-        transaction_func=_create,
+def _cache_expense_name(expense_name: ExpenseNameDTO, db: AsyncSession) -> None:
+    """
+    Cache an expense name once the transaction that read or created it is committed.
+
+    Args:
+        expense_name (ExpenseNameDTO): The expense name.
+        db (AsyncSession): The database session.
+    """
+    p.on_commit(
         db=db,
+        callback=partial(
+            expense_name_cache.set,
+            (expense_name.user_id, expense_name.name),
+            expense_name,
+        ),
     )
 
 
-async def _validate_data(
-    user_id: UUID, category_name: str, db: AsyncSession
-) -> CategoryResponse:
+async def warm_expense_name_cache(user_id: UUID, db: AsyncSession) -> int:
     """
-    Validate user and category for creating an expense.
+    Cache the expense names the user has the most expenses with.
 
     Args:
         user_id (UUID): The user's unique identifier.
-        category_name (str): The name of the category.
         db (AsyncSession): The database session.
 
     Returns:
-        CategoryResponse: The category of the expense.
+        int: The number of cached expense names.
     """
-    if not await v.user_exists(user_id=user_id, db=db):
+    result = await db.execute(
+        select(
+            ExpenseName.id,
+            ExpenseName.category_id,
+            ExpenseName.user_id,
+            ExpenseName.name,
+            ExpenseCategory.name.label("category"),
+        )
+        .join(ExpenseCategory, ExpenseName.category_id == ExpenseCategory.id)
+        .join(Expense, Expense.name_id == ExpenseName.id)
+        .filter(
+            ExpenseName.user_id == user_id,
+            Expense.user_id == user_id,
+            Expense.is_deleted == False,
+        )
+        .group_by(ExpenseName.id, ExpenseCategory.name)
+        .order_by(func.count().desc())
+        .limit(settings.EXPENSE_NAME_CACHE_WARM_LIMIT)
+    )
+    expense_names = [ExpenseNameDTO(**row) for row in result.mappings()]
+    for expense_name in expense_names:
+        expense_name_cache.set((user_id, expense_name.name), expense_name)
+
+    logger.info(f"Cached {len(expense_names)} expense names for user: {user_id}")
+    return len(expense_names)
+
+
+def get_expense_name_cache_stats() -> dict[str, Any]:
+    """
+    Get the hit and miss counters of the expense name cache.
+
+    Returns:
+        dict[str, Any]: The cache size, limits, hits, misses and hit ratio.
+    """
+    return expense_name_cache.stats()
+
+
+async def _get_user_timezone(user_id: UUID, db: AsyncSession) -> str:
+    """
+    Get the timezone of the user the expenses are written or read for.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        db (AsyncSession): The database session.
+
+    Returns:
+        str: The user's timezone.
+
+    Raises:
+        ApplicationError: If user with given ID does not exist.
+    """
+    user_timezone: Optional[str] = await db.scalar(
+        select(User.timezone).filter(User.id == user_id)
+    )
+    if user_timezone is None:
         logger.error(f"User not found: {user_id}")
         raise ApplicationError(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found.",
         )
+    return user_timezone
+
+
+async def _get_user_timezone_and_data_version(
+    user_id: UUID, db: AsyncSession
+) -> tuple[str, int]:
+    """
+    Get the timezone and the data_version of the user the expenses are written for.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        db (AsyncSession): The database session.
+
+    Returns:
+        tuple[str, int]: The user's timezone and data_version.
 
-    return await _get_category(user_id=user_id, category_name=category_name, db=db)
+    Raises:
+        ApplicationError: If user with given ID does not exist.
+    """
+    row = (
+        await db.execute(
+            select(User.timezone, User.data_version).filter(User.id == user_id)
+        )
+    ).first()
+    if row is None:
+        logger.error(f"User not found: {user_id}")
+        raise ApplicationError(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found.",
+        )
+    return row.timezone, row.data_version
 
 
 async def _get_category(
-    user_id: UUID, category_name: str, db: AsyncSession
+    user_id: UUID, category_name: str, data_version: int, db: AsyncSession
 ) -> CategoryResponse:
     """
-    Get the category of the expense.
+    Get the category of the expense, creating a custom category of the user if no
+    category has the name.
 
     Args:
         user_id (UUID): The user's unique identifier.
         category_name (str): The name of the category.
+        data_version (int): The user's current data_version.
         db (AsyncSession): The database session.
 
     Returns:
         CategoryResponse: The category of the expense.
     """
     category: Optional[CategoryResponse] = await category_service.get_by_name(
-        name=category_name, db=db
+        name=category_name, user_id=user_id, data_version=data_version, db=db
     )
-    return (
-        category
-        if category is not None
-        else await category_service.create_custom_category(
-            user_id=user_id, name=category_name, db=db
-        )
+    if category is not None:
+        return category
+
+    category_ids: dict[
+        str, UUID
+    ] = await category_service.get_or_create_custom_categories(
+        user_id=user_id, names={category_name}, db=db
     )
+    return CategoryResponse(id=category_ids[category_name], name=category_name)
 
 
-async def _get_by_id_db(expense_id: UUID, db: AsyncSession) -> Expense:
+async def _get_by_id_db(
+    expense_id: UUID, db: AsyncSession, profile: LoadProfileName = "detail"
+) -> Expense:
     """
     Get an expense by its unique identifier.
 
+    The expense is always reloaded from the database, also when it is already in
+    the session.
+
     Args:
         expense_id (UUID): The expense's unique identifier.
         db (AsyncSession): The database session.
+        profile (LoadProfileName): The load profile of the expense.
 
     Returns:
         Expense: The expense if found.
@@ -382,7 +1143,12 @@ async def _get_by_id_db(expense_id: UUID, db: AsyncSession) -> Expense:
     Raises:
         ApplicationError: If the expense is not found.
     """
-    result = await db.execute(select(Expense).filter(Expense.id == expense_id))
+    result = await db.execute(
+        select(Expense)
+        .options(*load_profile(profile))
+        .filter(Expense.id == expense_id)
+        .execution_options(populate_existing=True)
+    )
     expense: Optional[Expense] = result.scalars().first()
 
     if expense is None:
@@ -404,17 +1170,24 @@ async def delete_expense(expense_id: UUID, db: AsyncSession) -> None:
         db (AsyncSession): The database session.
     """
 
-    async def _delete():
-        expense: Expense = await _get_by_id_db(expense_id=expense_id, db=db)
+    async with p.unit_of_work(db=db):
+        expense: Expense = await _get_by_id_db(
+            expense_id=expense_id, db=db, profile="update"
+        )
+        if not expense.is_deleted:
+            await rollup_service.apply_expense_name_delta(
+                user_id=expense.user_id,
+                expense_name_id=expense.name_id,
+                expense_date=expense.date,
+                amount=-expense.amount,
+                count=-1,
+                db=db,
+            )
         expense.is_deleted = True
-        await db.commit()
-        logger.info(f"Deleted expense: {expense_id}")
-        return ResponseMessage(message="Expense deleted.")
+        await user_service.bump_data_version(user_id=expense.user_id, db=db)
 
-    return await p.process_db_transaction(
-        transaction_func=_delete,
-        db=db,
-    )
+    logger.info(f"Deleted expense: {expense_id}")
+    return ResponseMessage(message="Expense deleted.")
 
 
 async def update_expense(
@@ -432,10 +1205,12 @@ async def update_expense(
         ExpenseResponse: The updated expense.
     """
 
-    expense: Expense = await _get_by_id_db(expense_id=expense_id, db=db)
-    updated_expense: ExpenseResponse = await _update_expense(
-        expense=expense, expense_update=expense_update, db=db
-    )
+    async with p.unit_of_work(db=db):
+        expense: Expense = await _get_by_id_db(expense_id=expense_id, db=db)
+        updated_expense: ExpenseResponse = await _update_expense(
+            expense=expense, expense_update=expense_update, db=db
+        )
+        await user_service.bump_data_version(user_id=expense.user_id, db=db)
     logger.info(f"Updated expense: {expense_id}")
     return updated_expense
 
@@ -446,8 +1221,11 @@ async def _update_expense(
     """
     Update an expense.
 
+    The expense is loaded with its name, category and owner, updated_at is returned
+    by the UPDATE, the response is built without reading the expense back.
+
     Args:
-        expense (Expense): The expense to be updated.
+        expense (Expense): The expense to be updated, loaded with the detail profile.
         expense_update (ExpenseUpdate): The updated expense.
         db (AsyncSession): The database session.
 
@@ -455,15 +1233,33 @@ async def _update_expense(
         ExpenseResponse: The updated expense.
     """
 
-    async def _update():
+    async with p.unit_of_work(db=db):
+        current_name: ExpenseName = expense.name
+        name: str = current_name.name
+        category_name: str = current_name.category.name
+        if not expense.is_deleted:
+            # Taken out of the rollup before the update and added back after it,
+            # each time under the category the expense name has in the database.
+            await rollup_service.apply_expense_name_delta(
+                user_id=expense.user_id,
+                expense_name_id=expense.name_id,
+                expense_date=expense.date,
+                amount=-expense.amount,
+                count=-1,
+                db=db,
+            )
+
         if expense_update.name is not None:
             expense_name: ExpenseNameDTO = await _get_expense_name(
                 user_id=expense.user_id,
                 expense_name=expense_update.name,
-                category_id=expense.name.category_id,
+                category=CategoryResponse(
+                    id=current_name.category_id, name=category_name
+                ),
                 db=db,
             )
             expense.name_id = expense_name.id
+            name = expense_name.name
             logger.info(f"Updated expense_name: {expense_name}")
         if expense_update.amount is not None:
             expense.amount = expense_update.amount
@@ -473,19 +1269,84 @@ async def _update_expense(
             logger.info(f"Updated expense date: {expense.date}")
         if expense_update.category is not None:
             category: CategoryResponse = await _get_category(
-                category_name=expense_update.category, db=db
+                user_id=expense.user_id,
+                category_name=expense_update.category,
+                data_version=expense.user.data_version,
+                db=db,
+            )
+            await _set_expense_name_category(
+                expense=expense, category_id=category.id, db=db
+            )
+            category_name = category.name
+            p.on_commit(
+                db=db,
+                callback=partial(
+                    expense_name_cache.invalidate, (expense.user_id, name)
+                ),
             )
-            expense.name.category_id = category.id
             logger.info(f"Updated expense category: {category.name}")
 
         expense.note = expense_update.note
-        await db.commit()
-        await db.refresh(expense)
         logger.info(f"Updated expense note: {expense.note}")
-        return ExpenseResponse.create(expense=expense)
+        await db.flush()
+        if not expense.is_deleted:
+            _, category_name = await rollup_service.apply_expense_name_delta(
+                user_id=expense.user_id,
+                expense_name_id=expense.name_id,
+                expense_date=expense.date,
+                amount=expense.amount,
+                count=1,
+                db=db,
+            )
+        elif expense_update.name is not None and expense_update.category is None:
+            category_name = await db.scalar(
+                select(ExpenseCategory.name)
+                .join(ExpenseName, ExpenseName.category_id == ExpenseCategory.id)
+                .filter(ExpenseName.id == expense.name_id)
+            )
+        return _to_expense_response(
+            expense=expense,
+            name=name,
+            category=category_name,
+            user_timezone=expense.user.timezone,
+        )
+
+
+async def _set_expense_name_category(
+    expense: Expense, category_id: UUID, db: AsyncSession
+) -> None:
+    """
+    Move the expense name of an updated expense to another category.
+
+    The category applies to every expense sharing the name. The name is locked
+    FOR UPDATE while its previous category is read, and the other non-deleted
+    expenses of the name are moved to the new category in the daily rollup. The
+    updated expense itself is taken out of the rollup and added back by the caller.
 
-    return await p.process_db_transaction(
-        transaction_func=_update,
+    Args:
+        expense (Expense): The updated expense.
+        category_id (UUID): The new expense category's unique identifier.
+        db (AsyncSession): The database session.
+    """
+    previous_category_id: UUID = await db.scalar(
+        select(ExpenseName.category_id)
+        .filter(ExpenseName.id == expense.name_id)
+        .with_for_update()
+    )
+    if previous_category_id == category_id:
+        return
+
+    await db.execute(
+        update(ExpenseName)
+        .filter(ExpenseName.id == expense.name_id)
+        .values(category_id=category_id)
+    )
+    await rollup_service.move_expense_name(
+        user_id=expense.user_id,
+        expense_name_id=expense.name_id,
+        from_category_id=previous_category_id,
+        to_category_id=category_id,
+        exclude_expense_id=expense.id,
         db=db,
     )
 
@@ -503,14 +1364,9 @@ async def add_note(expense_id: UUID, note: Note, db: AsyncSession) -> ExpenseRes
         ExpenseResponse: The updated expense.
     """
 
-    async def _add_note():
+    async with p.unit_of_work(db=db):
         expense: Expense = await _get_by_id_db(expense_id=expense_id, db=db)
         expense.note = note.content
-        await db.commit()
-        await db.refresh(expense)
+        await db.flush()
+        await user_service.bump_data_version(user_id=expense.user_id, db=db)
         return ExpenseResponse.create(expense=expense)
-
-    return await p.process_db_transaction(
-        transaction_func=_add_note,
-        db=db,
-    )
@@ -10,8 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import Settings, get_settings
 from app.schemas.common.common import Token
 from app.schemas.user import UserResponse
-from app.services import auth_service, user_service
-from app.services.utils import utils as u
+from app.services import auth_service, expense_service, user_service
+from app.services.utils import hashing, utils as u
 
 settings: Settings = get_settings()
 
@@ -73,6 +73,8 @@ async def callback(request: Request, db: AsyncSession) -> Response:
     google_token = await _get_google_token(code=code)
 
     google_user = await _get_google_user_info(token=google_token, db=db)
+    if settings.EXPENSE_NAME_CACHE_WARM_ON_LOGIN:
+        await expense_service.warm_expense_name_cache(user_id=google_user.id, db=db)
 
     data: dict = {"sub": str(google_user.id)}
     access_token: Token = u.create_access_token(data=data)
@@ -179,7 +181,7 @@ async def register_new_google_user(user: dict, db: AsyncSession) -> UserResponse
     new_user: UserResponse = await user_service.create_new_user(
         username=user["email"],
         email=user["email"],
-        hashed_password=u.hash_password("default_password"),
+        hashed_password=await hashing.hash_password("default_password"),
         timezone="UTC",
         google_id=user["id"],
         db=db,
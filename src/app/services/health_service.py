@@ -0,0 +1,42 @@
+import logging
+import time
+
+from fastapi import status
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.common.application_error import ApplicationError
+from app.schemas.health import DatabaseHealth
+from app.sql_app.database import get_pool_status
+
+logger = logging.getLogger(__name__)
+
+
+async def get_db_health(db: AsyncSession) -> DatabaseHealth:
+    """
+    Ping the database and report the connection pool counts.
+
+    Args:
+        db (AsyncSession): The database session.
+
+    Returns:
+        DatabaseHealth: The ping latency and the live pool counts.
+
+    Raises:
+        ApplicationError: If the database cannot be reached.
+    """
+    started_at = time.perf_counter()
+    try:
+        await db.execute(text("SELECT 1"))
+    except (SQLAlchemyError, OSError) as e:
+        logger.error(f"Database health check failed: {e}")
+        raise ApplicationError(
+            detail="Database is unavailable",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    latency_ms = (time.perf_counter() - started_at) * 1000
+
+    return DatabaseHealth(
+        status="ok", latency_ms=round(latency_ms, 3), **get_pool_status()
+    )
@@ -0,0 +1,277 @@
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.sql_app.expense.expense import Expense
+from app.sql_app.expense_category.expense_category import ExpenseCategory
+from app.sql_app.expense_daily_rollup.expense_daily_rollup import ExpenseDailyRollup
+from app.sql_app.expense_name.expense_name import ExpenseName
+
+logger = logging.getLogger(__name__)
+
+
+def rollup_day(expense_date: datetime) -> date:
+    """
+    Get the UTC day an expense is accounted for in the daily rollup.
+
+    Args:
+        expense_date (datetime): The date the expense was incurred. Naive values are
+            treated as UTC, the same way the database driver stores them.
+
+    Returns:
+        date: The UTC day of the expense.
+    """
+    if expense_date.tzinfo is None:
+        return expense_date.date()
+    return expense_date.astimezone(timezone.utc).date()
+
+
+async def apply_expense_name_delta(
+    user_id: UUID,
+    expense_name_id: UUID,
+    expense_date: datetime,
+    amount: float,
+    count: int,
+    db: AsyncSession,
+) -> tuple[UUID, str]:
+    """
+    Add an amount and a count to the daily rollup row of an expense name's category.
+
+    The category is read from expense_name by the upsert itself, never from a cached
+    copy, and the expense name row is locked FOR SHARE until the transaction ends.
+    A concurrent change of the name's category waits for this transaction, so its
+    move of the name's expenses sees this one, and a delta applied after such a change
+    uses the new category. Does not commit, the caller owns the transaction.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        expense_name_id (UUID): The expense name's unique identifier.
+        expense_date (datetime): The date the expense was incurred.
+        amount (float): The amount to add, negative to subtract.
+        count (int): The number of expenses to add, negative to subtract.
+        db (AsyncSession): The database session.
+
+    Returns:
+        tuple[UUID, str]: The identifier and the name of the expense category the
+            delta was applied to.
+    """
+    source = (
+        select(
+            literal(user_id, ExpenseDailyRollup.user_id.type),
+            ExpenseName.category_id,
+            literal(rollup_day(expense_date), ExpenseDailyRollup.day.type),
+            literal(amount, ExpenseDailyRollup.total.type),
+            literal(count, ExpenseDailyRollup.count.type),
+        )
+        .filter(ExpenseName.id == expense_name_id)
+        .with_for_update(read=True)
+    )
+    statement = pg_insert(ExpenseDailyRollup).from_select(
+        ["user_id", "expense_category_id", "day", "total", "count"], source
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            ExpenseDailyRollup.user_id,
+            ExpenseDailyRollup.expense_category_id,
+            ExpenseDailyRollup.day,
+        ],
+        set_={
+            "total": ExpenseDailyRollup.total + statement.excluded.total,
+            "count": ExpenseDailyRollup.count + statement.excluded.count,
+        },
+    ).returning(ExpenseDailyRollup.expense_category_id)
+    upserted = statement.cte("upserted")
+    result = await db.execute(
+        select(upserted.c.expense_category_id, ExpenseCategory.name).join(
+            ExpenseCategory, ExpenseCategory.id == upserted.c.expense_category_id
+        )
+    )
+    expense_category_id, category_name = result.one()
+    logger.info(
+        f"Applied rollup delta {amount}/{count} to category {expense_category_id} "
+        f"for user: {user_id}"
+    )
+    return expense_category_id, category_name
+
+
+async def apply_deltas(
+    user_id: UUID,
+    deltas: list[tuple[UUID, datetime, float]],
+    db: AsyncSession,
+) -> None:
+    """
+    Add many new expenses of a user to the daily rollup with one statement.
+
+    The amounts are summed per (expense category, day) first, so every rollup row is
+    upserted once. Does not commit, the caller owns the transaction.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        deltas (list[tuple[UUID, datetime, float]]): The expense category, date and
+            amount of every new expense.
+        db (AsyncSession): The database session.
+    """
+    totals: dict[tuple[UUID, date], list] = defaultdict(lambda: [0, 0])
+    for expense_category_id, expense_date, amount in deltas:
+        total = totals[(expense_category_id, rollup_day(expense_date))]
+        total[0] += amount
+        total[1] += 1
+
+    if not totals:
+        return
+
+    statement = pg_insert(ExpenseDailyRollup).values(
+        [
+            {
+                "user_id": user_id,
+                "expense_category_id": expense_category_id,
+                "day": day,
+                "total": amount,
+                "count": count,
+            }
+            for (expense_category_id, day), (amount, count) in totals.items()
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            ExpenseDailyRollup.user_id,
+            ExpenseDailyRollup.expense_category_id,
+            ExpenseDailyRollup.day,
+        ],
+        set_={
+            "total": ExpenseDailyRollup.total + statement.excluded.total,
+            "count": ExpenseDailyRollup.count + statement.excluded.count,
+        },
+    )
+    await db.execute(statement)
+    logger.info(f"Applied {len(totals)} rollup deltas for user: {user_id}")
+
+
+async def move_expense_name(
+    user_id: UUID,
+    expense_name_id: UUID,
+    from_category_id: UUID,
+    to_category_id: UUID,
+    db: AsyncSession,
+    exclude_expense_id: Optional[UUID] = None,
+) -> None:
+    """
+    Move the expenses of an expense name from one category to another in the daily
+    rollup, with one statement.
+
+    The expenses are summed per day in the database, the sums are subtracted from
+    the old category's rows and added to the new category's. Does not commit, the
+    caller owns the transaction.
+
+    Args:
+        user_id (UUID): The user's unique identifier.
+        expense_name_id (UUID): The expense name's unique identifier.
+        from_category_id (UUID): The expense category the expenses are moved from.
+        to_category_id (UUID): The expense category the expenses are moved to.
+        db (AsyncSession): The database session.
+        exclude_expense_id (UUID | None): An expense left out, e.g. one whose own
+            delta is applied separately.
+    """
+    day = func.date(func.timezone("UTC", Expense.date))
+    moved = (
+        select(
+            day.label("day"),
+            func.sum(Expense.amount).label("total"),
+            func.count(Expense.id).label("count"),
+        )
+        .filter(
+            Expense.user_id == user_id,
+            Expense.name_id == expense_name_id,
+            Expense.is_deleted == False,
+        )
+        .group_by(day)
+    )
+    if exclude_expense_id is not None:
+        moved = moved.filter(Expense.id != exclude_expense_id)
+    moved = moved.cte("moved")
+
+    user = literal(user_id, ExpenseDailyRollup.user_id.type)
+    category_type = ExpenseDailyRollup.expense_category_id.type
+    source = union_all(
+        select(
+            user,
+            literal(from_category_id, category_type),
+            moved.c.day,
+            -moved.c.total,
+            -moved.c.count,
+        ),
+        select(
+            user,
+            literal(to_category_id, category_type),
+            moved.c.day,
+            moved.c.total,
+            moved.c.count,
+        ),
+    )
+    statement = pg_insert(ExpenseDailyRollup).from_select(
+        ["user_id", "expense_category_id", "day", "total", "count"], source
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            ExpenseDailyRollup.user_id,
+            ExpenseDailyRollup.expense_category_id,
+            ExpenseDailyRollup.day,
+        ],
+        set_={
+            "total": ExpenseDailyRollup.total + statement.excluded.total,
+            "count": ExpenseDailyRollup.count + statement.excluded.count,
+        },
+    )
+    await db.execute(statement)
+    logger.info(
+        f"Moved expense name {expense_name_id} from category {from_category_id} "
+        f"to {to_category_id} in the rollup of user: {user_id}"
+    )
+
+
+async def rebuild_rollup(db: AsyncSession, user_id: Optional[UUID] = None) -> int:
+    """
+    Recompute the daily rollup from the expense table.
+
+    Does not commit, the caller owns the transaction.
+
+    Args:
+        db (AsyncSession): The database session.
+        user_id (UUID | None): Rebuild only this user's rows, or every user's if None.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    day = func.date(func.timezone("UTC", Expense.date))
+    source = (
+        select(
+            Expense.user_id,
+            ExpenseName.category_id,
+            day,
+            func.sum(Expense.amount),
+            func.count(Expense.id),
+        )
+        .join(ExpenseName, Expense.name_id == ExpenseName.id)
+        .filter(Expense.is_deleted == False)
+        .group_by(Expense.user_id, ExpenseName.category_id, day)
+    )
+    clear = delete(ExpenseDailyRollup)
+
+    if user_id is not None:
+        source = source.filter(Expense.user_id == user_id)
+        clear = clear.filter(ExpenseDailyRollup.user_id == user_id)
+
+    await db.execute(clear)
+    result = await db.execute(
+        insert(ExpenseDailyRollup).from_select(
+            ["user_id", "expense_category_id", "day", "total", "count"], source
+        )
+    )
+    logger.info(f"Rebuilt {result.rowcount} rollup rows for user: {user_id or 'all'}")
+    return result.rowcount
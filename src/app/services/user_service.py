@@ -1,19 +1,35 @@
+import hashlib
 import logging
+from datetime import date, datetime
 from typing import Any, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import status
 
+from app.core.config import Settings, get_settings
 from app.schemas.common.application_error import ApplicationError
 from app.schemas.user import BaseUser, UpdateUser, UserRegistration, UserResponse
 from app.schemas.common.common import ResponseMessage
-from app.services.utils import processors as p, validators as v, utils as u
+from app.schemas.expense import get_zone
+from app.services.utils import processors as p, validators as v
+from app.services.utils import hashing, timezones
+from app.services.utils.cache import TTLCache
 from app.sql_app.user.user import User
 
+settings: Settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Users resolved for authenticated requests. The cache is per process, so a change
+# made through another worker is seen here after at most USER_CACHE_TTL_SECONDS.
+# Admin authorization does not rely on it, see is_admin.
+user_cache: TTLCache[UserResponse] = TTLCache(
+    maxsize=settings.USER_CACHE_MAXSIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    name="user",
+)
+
 
 async def signup(user: UserRegistration, db: AsyncSession) -> ResponseMessage:
     """
@@ -31,8 +47,8 @@ async def signup(user: UserRegistration, db: AsyncSession) -> ResponseMessage:
         await _validate_data(
             user_data=BaseUser(username=user.username, email=user.email), db=db
         )
-        hashed_password = u.hash_password(password=user.password)
-        user_timezone = _get_user_timezone(user=user)
+        hashed_password = await hashing.hash_password(password=user.password)
+        user_timezone = await _get_user_timezone(user=user)
         new_user: UserResponse = await create_new_user(
             username=user.username,
             email=user.email,
@@ -79,10 +95,10 @@ async def create_new_user(
             timezone=timezone,
             google_id=google_id,
         )
-        logger.info(f"Created user: {new_user.id}")
         db.add(new_user)
+        await db.flush()
+        logger.info(f"Created user: {new_user.id}")
         await db.commit()
-        await db.refresh(new_user)
 
         return UserResponse.create(user=new_user)
 
@@ -132,7 +148,7 @@ async def _validate_data(user_data: BaseUser, db: AsyncSession) -> None:
         )
 
 
-def _get_user_timezone(user: UserRegistration) -> Any:
+async def _get_user_timezone(user: UserRegistration) -> Any:
     """
     Get the timezone of a user.
 
@@ -142,7 +158,7 @@ def _get_user_timezone(user: UserRegistration) -> Any:
     Returns:
         Any: The timezone of the user.
     """
-    timezone: Optional[str] = u.get_timezone(
+    timezone: Optional[str] = await timezones.get_timezone(
         city=user.city, country=user.country, state=user.state
     )
     if not timezone:
@@ -206,6 +222,8 @@ async def get_by_id(user_id: UUID, db: AsyncSession) -> UserResponse:
     """
     Get a user by their ID.
 
+    The user is served from the user cache when present, and cached otherwise.
+
     Args:
         user_id (UUID): The username to get.
         db (AsyncSession): The database session.
@@ -217,6 +235,10 @@ async def get_by_id(user_id: UUID, db: AsyncSession) -> UserResponse:
         ApplicationError: If the user is not found.
     """
 
+    cached_user: Optional[UserResponse] = user_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+
     user: Optional[User] = await _get_db_user_by_id(user_id=user_id, db=db)
 
     if user is None:
@@ -228,7 +250,116 @@ async def get_by_id(user_id: UUID, db: AsyncSession) -> UserResponse:
         )
 
     logger.info(msg="Fetched user")
-    return UserResponse.create(user=user)
+    user_response = UserResponse.create(user=user)
+    user_cache.set(user_id, user_response)
+    return user_response
+
+
+def invalidate_user(user_id: UUID) -> None:
+    """
+    Drop a user from the user cache.
+
+    Must be called after every committed change to a user, including deletion.
+
+    Args:
+        user_id (UUID): The user's ID.
+    """
+    user_cache.invalidate(user_id)
+    logger.info(f"Invalidated cached user: {user_id}")
+
+
+def get_user_cache_stats() -> dict[str, Any]:
+    """
+    Get the hit and miss counters of the user cache.
+
+    Returns:
+        dict[str, Any]: The user cache stats.
+    """
+    return user_cache.stats()
+
+
+async def is_admin(user_id: UUID, db: AsyncSession) -> bool:
+    """
+    Check whether a user has the admin role.
+
+    Read from the database on every call: a primary key lookup, and a role change
+    made through another worker must apply at once, not when the user cache
+    expires. A cached user whose role changed is dropped from the cache.
+
+    Args:
+        user_id (UUID): The user's ID.
+        db (AsyncSession): The database session.
+
+    Returns:
+        bool: True if the user exists and is an admin.
+    """
+    admin: bool = bool(
+        await db.scalar(select(User.is_admin).filter(User.id == user_id))
+    )
+    cached_user: Optional[UserResponse] = user_cache.get(user_id)
+    if cached_user is not None and cached_user.is_admin != admin:
+        invalidate_user(user_id=user_id)
+    return admin
+
+
+async def get_data_version(user_id: UUID, db: AsyncSession) -> int:
+    """
+    Get the version of a user's expense and category data.
+
+    Read from the database on every call: a primary key lookup, and a cached copy
+    would go stale when another worker handles the user's writes.
+
+    Args:
+        user_id (UUID): The user's ID.
+        db (AsyncSession): The database session.
+
+    Returns:
+        int: The data version, 0 for an unknown user.
+    """
+    data_version: Optional[int] = await db.scalar(
+        select(User.data_version).filter(User.id == user_id)
+    )
+    return data_version or 0
+
+
+async def bump_data_version(user_id: UUID, db: AsyncSession) -> None:
+    """
+    Bump the version of a user's expense and category data.
+
+    Must be called in the transaction of every write that changes what the user's
+    expense, category or analysis endpoints return.
+
+    Args:
+        user_id (UUID): The user's ID.
+        db (AsyncSession): The database session.
+    """
+    await db.execute(
+        update(User)
+        .filter(User.id == user_id)
+        .values(data_version=User.data_version + 1)
+    )
+
+
+async def get_data_etag(user: UserResponse, db: AsyncSession) -> str:
+    """
+    Get the ETag of a user's expense, category and analysis responses.
+
+    The ETag changes with the data version and with the day, as the time periods
+    of the filters and the analysis are relative to today.
+
+    Args:
+        user (UserResponse): The user.
+        db (AsyncSession): The database session.
+
+    Returns:
+        str: The weak ETag.
+    """
+    data_version: int = await get_data_version(user_id=user.id, db=db)
+    today: str = f"{date.today()}/{datetime.now(get_zone(user.timezone)).date()}"
+    digest = hashlib.blake2b(
+        f"{user.id}/{data_version}/{today}".encode(), digest_size=8
+    ).hexdigest()
+    return f'W/"{data_version}-{digest}"'
 
 
 async def get_all(
@@ -278,6 +409,7 @@ async def change_user_role(user_id: UUID, db: AsyncSession) -> ResponseMessage:
         user.is_admin = not user.is_admin
         logger.info(f"Changing is_admin for user {user.id} to {user.is_admin}")
         await db.commit()
+        invalidate_user(user_id=user.id)
 
         return ResponseMessage(message="User role updated successfully")
 
@@ -347,17 +479,19 @@ async def _update_user(
     async def _update():
         if update_data.timezone is not None:
             user.timezone = update_data.timezone
+            await bump_data_version(user_id=user.id, db=db)
         if update_data.password:
-            hashed_password = u.hash_password(password=update_data.password)
-            if hashed_password == user.password:
+            if await hashing.verify_password(
+                password=update_data.password, hashed_password=user.password
+            ):
                 raise ApplicationError(
                     detail="New password must be different from the old password",
                     status_code=status.HTTP_400_BAD_REQUEST,
                 )
-            user.password = hashed_password
+            user.password = await hashing.hash_password(password=update_data.password)
 
         await db.commit()
-        await db.refresh(user)
+        invalidate_user(user_id=user.id)
         logger.info(f"Updated user info for user with ID {user.id}")
         return UserResponse.create(user=user)
 
@@ -379,7 +513,9 @@ async def verify_password(
         ResponseMessage: The response message.
     """
 
-    if not u.verify_password(password=password, hashed_password=user.password):
+    if not await hashing.verify_password(
+        password=password, hashed_password=user.password
+    ):
         raise ApplicationError(
             detail="Invalid password",
             status_code=status.HTTP_403_FORBIDDEN,
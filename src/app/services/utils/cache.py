@@ -0,0 +1,143 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Generic, Hashable, Iterable, Optional, TypeVar
+
+from app.core import metrics
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+_named_caches: dict[str, "TTLCache"] = {}
+
+
+class TTLCache(Generic[V]):
+    """
+    An in-process LRU cache whose entries expire after a fixed time to live.
+
+    The least recently used entry is evicted once maxsize is reached. Hits and
+    misses are counted so the cache can be sized from its stats.
+
+    Caches created with a name are exported on /metrics.
+
+    Attributes:
+        maxsize (int): The maximum number of entries.
+        ttl (float): The number of seconds an entry is served for.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups not found or expired.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: Optional[str] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self._lock = Lock()
+        if name is not None:
+            _named_caches[name] = self
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        Get a cached value.
+
+        Args:
+            key (Hashable): The key of the value.
+
+        Returns:
+            V | None: The value, or None if it is not cached or has expired.
+        """
+        with self._lock:
+            entry: Any = self._entries.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= time.monotonic():
+                if entry is not _MISSING:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: V) -> None:
+        """
+        Cache a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (Hashable): The key of the value.
+            value (V): The value.
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Remove a value from the cache if it is cached.
+
+        Args:
+            key (Hashable): The key of the value.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all values from the cache and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict[str, Any]: The size, limits, hits, misses and hit ratio.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _cache_samples(stat: str) -> Iterable[tuple[tuple[str, ...], float]]:
+    return [
+        ((name,), cache.stats()[stat]) for name, cache in sorted(_named_caches.items())
+    ]
+
+
+metrics.CallbackMetric(
+    "cache_hits_total",
+    "Lookups served from the in-process caches.",
+    callback=lambda: _cache_samples("hits"),
+    label_names=("cache",),
+    type_name="counter",
+)
+metrics.CallbackMetric(
+    "cache_misses_total",
+    "Lookups not found or expired in the in-process caches.",
+    callback=lambda: _cache_samples("misses"),
+    label_names=("cache",),
+    type_name="counter",
+)
+metrics.CallbackMetric(
+    "cache_entries",
+    "Entries held by the in-process caches.",
+    callback=lambda: _cache_samples("size"),
+    label_names=("cache",),
+)
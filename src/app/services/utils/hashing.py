@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import status
+from passlib.hash import argon2
+
+from app.core.config import Settings, get_settings
+from app.schemas.common.application_error import ApplicationError
+
+settings: Settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_pending: int = 0
+_stats: dict[str, float] = {
+    "completed": 0,
+    "rejected": 0,
+    "queue_wait_seconds_total": 0.0,
+    "queue_wait_seconds_max": 0.0,
+    "hash_seconds_total": 0.0,
+    "hash_seconds_max": 0.0,
+}
+
+
+def start_executor() -> ProcessPoolExecutor:
+    """
+    Start the password hashing process pool if it is not running.
+
+    Workers are spawned rather than forked, so they do not inherit the event loop,
+    database connections or thread locks of the API process.
+
+    Returns:
+        ProcessPoolExecutor: The password hashing process pool.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(
+            f"Started {settings.PASSWORD_HASHING_WORKERS} password hashing workers"
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """
+    Stop the password hashing process pool, waiting for running work to finish.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        logger.info("Stopped password hashing workers")
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hash a password with argon2 in the password hashing process pool.
+
+    Args:
+        password (str): The password to hash.
+
+    Returns:
+        str: The argon2 hash of the password.
+
+    Raises:
+        ApplicationError: If too much hashing work is already pending.
+    """
+    return await _submit(_hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against an argon2 hash in the password hashing process pool.
+
+    Args:
+        password (str): The password to verify.
+        hashed_password (str): The argon2 hash stored in the database.
+
+    Returns:
+        bool: True if the password matches the hash, False otherwise.
+
+    Raises:
+        ApplicationError: If too much hashing work is already pending.
+    """
+    return await _submit(_verify, password, hashed_password)
+
+
+def get_stats() -> dict[str, Any]:
+    """
+    Get the counters of the password hashing pool.
+
+    Returns:
+        dict[str, Any]: The pool size, pending and completed work, rejections and
+            the queue wait and hash times in seconds.
+    """
+    completed = _stats["completed"]
+    return {
+        "workers": settings.PASSWORD_HASHING_WORKERS,
+        "max_pending": settings.PASSWORD_HASHING_MAX_PENDING,
+        "pending": _pending,
+        **_stats,
+        "queue_wait_seconds_avg": (
+            _stats["queue_wait_seconds_total"] / completed if completed else 0.0
+        ),
+        "hash_seconds_avg": (
+            _stats["hash_seconds_total"] / completed if completed else 0.0
+        ),
+    }
+
+
+async def _submit(fn: Callable, *args: str) -> Any:
+    """
+    Run a hashing function in the process pool, rejecting it if the pool is saturated.
+
+    Args:
+        fn (Callable): A module level function returning (result, seconds taken).
+        *args (str): The arguments of the function.
+
+    Returns:
+        Any: The result of the function.
+
+    Raises:
+        ApplicationError: If PASSWORD_HASHING_MAX_PENDING calls are already pending.
+    """
+    global _pending
+    if _pending >= settings.PASSWORD_HASHING_MAX_PENDING:
+        _stats["rejected"] += 1
+        logger.error(f"Rejected password hashing, {_pending} calls pending")
+        raise ApplicationError(
+            detail="The server is busy, please try again later",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    _pending += 1
+    submitted_at = time.perf_counter()
+    try:
+        result, hash_seconds = await asyncio.get_running_loop().run_in_executor(
+            start_executor(), fn, *args
+        )
+    finally:
+        _pending -= 1
+
+    queue_wait_seconds = max(time.perf_counter() - submitted_at - hash_seconds, 0.0)
+    _stats["completed"] += 1
+    _stats["queue_wait_seconds_total"] += queue_wait_seconds
+    _stats["queue_wait_seconds_max"] = max(
+        _stats["queue_wait_seconds_max"], queue_wait_seconds
+    )
+    _stats["hash_seconds_total"] += hash_seconds
+    _stats["hash_seconds_max"] = max(_stats["hash_seconds_max"], hash_seconds)
+    return result
+
+
+def _hash(password: str) -> tuple[str, float]:
+    """
+    Hash a password with argon2, runs in a pool worker.
+    """
+    started_at = time.perf_counter()
+    hashed_password = argon2.hash(password)
+    return hashed_password, time.perf_counter() - started_at
+
+
+def _verify(password: str, hashed_password: str) -> tuple[bool, float]:
+    """
+    Verify a password against an argon2 hash, runs in a pool worker.
+    """
+    started_at = time.perf_counter()
+    try:
+        verified = argon2.verify(password, hashed_password)
+    except ValueError:
+        verified = False
+    return verified, time.perf_counter() - started_at
@@ -1,32 +1,46 @@
 import logging
-from typing import Callable, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Any, NoReturn, Optional
 
-from fastapi import status
-from fastapi.responses import JSONResponse
+from fastapi import Request, status
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic_core import to_json
 
 from app.schemas.common.application_error import ApplicationError
 
 logger = logging.getLogger(__name__)
 
+UNIT_OF_WORK_KEY = "unit_of_work"
+ON_COMMIT_KEY = "unit_of_work_on_commit"
+
 
 async def process_request(
     get_entities_fn: Callable,
     status_code: int,
     not_found_err_msg: str,
-) -> JSONResponse:
+    etag_fn: Optional[Callable[[], Awaitable[str]]] = None,
+    request: Optional[Request] = None,
+) -> Response:
     """
     Asynchronously processes a request by calling the provided function to get entities and returns an appropriate response.
 
+    The result is encoded to JSON bytes in one pass and sent pre-encoded, without
+    an intermediate dict. With an etag_fn the response carries its ETag, and a request whose
+    If-None-Match matches it is answered with 304 before get_entities_fn runs.
+
     Args:
         get_entities_fn (Callable): A function that retrieves entities asynchronously.
+            Entities already serialized to JSON bytes are sent as they are.
         status_code (int): The HTTP status code to return in the response if successful.
         not_found_err_msg (str): The error message to log if a TypeError occurs.
+        etag_fn (Callable | None): A function that computes the ETag of the response
+            without building it.
+        request (Request | None): The request, for its If-None-Match header.
 
     Returns:
-        JSONResponse: A JSON response with the formatted data or a redirect response.
+        Response: A JSON response with the formatted data or a redirect response.
 
     Raises:
         ApplicationError: If an application-specific error occurs.
@@ -34,11 +48,25 @@ async def process_request(
         SyntaxError: If a syntax error occurs, typically indicating a bad request.
     """
     try:
-        response = await get_entities_fn()
+        headers: Optional[dict[str, str]] = None
+        if etag_fn is not None:
+            etag: str = await etag_fn()
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if request is not None and _etag_matches(
+                etag=etag, if_none_match=request.headers.get("if-none-match")
+            ):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+                )
 
-        formatted_response = _format_response(response)
+        response = await get_entities_fn()
 
-        return JSONResponse(status_code=status_code, content=formatted_response)
+        return Response(
+            status_code=status_code,
+            content=_encode_response(response),
+            media_type="application/json",
+            headers=headers,
+        )
     except ApplicationError as ex:
         logger.exception(str(ex))
         return JSONResponse(
@@ -59,6 +87,29 @@ async def process_request(
         )
 
 
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """
+    Check an If-None-Match header against an ETag with the weak comparison.
+
+    Args:
+        etag (str): The current ETag.
+        if_none_match (str | None): The If-None-Match header of the request.
+
+    Returns:
+        bool: Whether the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    current: str = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == current
+        for candidate in if_none_match.split(",")
+    )
+
+
 async def process_db_transaction(transaction_func: Callable, db: AsyncSession) -> Any:
     """
     Executes a database transaction function and handles exceptions.
@@ -71,45 +122,117 @@ async def process_db_transaction(transaction_func: Callable, db: AsyncSession) -
         Any: The result of the transaction function if successful.
 
     Raises:
-        ApplicationError: If an IntegrityError or SQLAlchemyError occurs during the transaction.
+        ApplicationError: If an IntegrityError or SQLAlchemyError occurs during the transaction,
+            or the ApplicationError raised by the transaction function itself.
     """
     try:
         return await transaction_func()
-    except IntegrityError as e:
-        await db.rollback()
-        logger.error(f"Integrity error: {str(e)}")
-        raise ApplicationError(
-            detail=f"Database conflict occurred: {str(e)}",
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
-    except SQLAlchemyError as e:
-        await db.rollback()
-        logger.error(f"Unexpected DB error: {str(e)}")
+    except Exception as e:
+        await _rollback_and_raise(error=e, db=db)
+
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Runs a block of writes as one transaction that is committed once at the end.
+
+    Helpers inside the block flush instead of committing. A unit of work opened
+    inside another one joins it, so helpers can open their own and still be
+    committed by the outermost block only. The callbacks registered with on_commit
+    run after the commit and are dropped on rollback.
+
+    Args:
+        db (AsyncSession): The SQLAlchemy database session.
+
+    Yields:
+        AsyncSession: The same database session.
+
+    Raises:
+        ApplicationError: If an IntegrityError or SQLAlchemyError occurs during the transaction,
+            or the ApplicationError raised inside the block itself.
+    """
+    if db.info.get(UNIT_OF_WORK_KEY):
+        yield db
+        return
+
+    db.info[UNIT_OF_WORK_KEY] = True
+    try:
+        yield db
+        await db.commit()
+    except Exception as e:
+        await _rollback_and_raise(error=e, db=db)
+    finally:
+        db.info.pop(UNIT_OF_WORK_KEY, None)
+        callbacks: list[Callable[[], None]] = db.info.pop(ON_COMMIT_KEY, [])
+
+    for callback in callbacks:
+        callback()
+
+
+def on_commit(db: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Runs a callback once the current unit of work is committed.
+
+    Callbacks run in the order they were registered. Outside a unit of work the
+    callback runs right away, when the unit of work is rolled back it never runs.
+
+    Args:
+        db (AsyncSession): The SQLAlchemy database session.
+        callback (Callable[[], None]): The callback, e.g. a cache update.
+    """
+    if not db.info.get(UNIT_OF_WORK_KEY):
+        callback()
+        return
+
+    db.info.setdefault(ON_COMMIT_KEY, []).append(callback)
+
+
+async def _rollback_and_raise(error: Exception, db: AsyncSession) -> NoReturn:
+    """
+    Rolls back the transaction and raises the error as an ApplicationError.
+
+    Args:
+        error (Exception): The error raised inside the transaction.
+        db (Session): The SQLAlchemy database session.
+
+    Raises:
+        ApplicationError: The error itself if it is one, otherwise a 500 error.
+    """
+    await db.rollback()
+    if isinstance(error, ApplicationError):
+        raise error
+    if isinstance(error, IntegrityError):
+        logger.error(f"Integrity error: {str(error)}")
         raise ApplicationError(
-            detail=f"{str(e)}",
+            detail=f"Database conflict occurred: {str(error)}",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Unexpected error: {str(e)}")
+    if isinstance(error, SQLAlchemyError):
+        logger.error(f"Unexpected DB error: {str(error)}")
         raise ApplicationError(
-            detail=f"An unexpected error occurred: {str(e)}",
+            detail=f"{str(error)}",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+    logger.error(f"Unexpected error: {str(error)}")
+    raise ApplicationError(
+        detail=f"An unexpected error occurred: {str(error)}",
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+    )
 
 
-def _format_response(data) -> dict:
+def _encode_response(data: Any) -> bytes:
     """
-    Formats the response data to include the detail key.
+    Encodes the response data to JSON under the detail key.
+
+    Pydantic models, lists and dicts of them are serialized straight to bytes by
+    pydantic's serializer, with the same output as model_dump(mode="json").
 
     Args:
-        data (Union[BaseModel, list[BaseModel]]): The data to format.
+        data (Union[BaseModel, list[BaseModel], dict, bytes]): The data to encode,
+            bytes are taken as already encoded JSON.
 
     Returns:
-        dict: The formatted response data.
+        bytes: The JSON response body.
     """
-    if isinstance(data, list):
-        return {"detail": [item.model_dump(mode="json") for item in data]}
-    return {
-        "detail": data.model_dump(mode="json") if isinstance(data, BaseModel) else data
-    }
+    content: bytes = data if isinstance(data, bytes) else to_json(data)
+    return b'{"detail":' + content + b"}"
@@ -0,0 +1,229 @@
+import asyncio
+import csv
+import logging
+import unicodedata
+from threading import Lock
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from geopy.geocoders import Nominatim
+from timezonefinder import TimezoneFinder
+
+from app.core.config import Settings, get_settings
+from app.services.utils.cache import TTLCache
+
+settings: Settings = get_settings()
+logger = logging.getLogger(__name__)
+
+GAZETTEER_PATH = Path(__file__).parents[2] / "data" / "cities.csv"
+COUNTRY_ALIASES = {
+    "usa": "united states",
+    "us": "united states",
+    "united states of america": "united states",
+    "america": "united states",
+    "uk": "united kingdom",
+    "great britain": "united kingdom",
+    "britain": "united kingdom",
+    "england": "united kingdom",
+    "scotland": "united kingdom",
+    "wales": "united kingdom",
+    "czechia": "czech republic",
+    "macedonia": "north macedonia",
+    "republic of korea": "south korea",
+    "korea": "south korea",
+    "uae": "united arab emirates",
+    "holland": "netherlands",
+    "the netherlands": "netherlands",
+    "russian federation": "russia",
+    "turkiye": "turkey",
+    "viet nam": "vietnam",
+    "drc": "democratic republic of the congo",
+}
+
+# Loading the timezone polygons is the expensive part, so one finder is shared. It
+# reads from open data files and is not safe to use from several threads at once.
+_timezone_finder = TimezoneFinder()
+_timezone_finder_lock = Lock()
+
+# Resolved timezones per normalized (city, country, state). Failed lookups are not
+# cached, so a location that could not be resolved, e.g. because Nominatim was
+# unreachable, is tried again on the next request.
+timezone_cache: TTLCache[str] = TTLCache(
+    maxsize=settings.TIMEZONE_CACHE_MAXSIZE,
+    ttl=settings.TIMEZONE_CACHE_TTL_SECONDS,
+    name="timezone",
+)
+
+
+class Gazetteer:
+    """
+    An in-memory index of the bundled city gazetteer.
+
+    Attributes:
+        by_city_state_country (dict): Coordinates keyed by (city, state, country).
+        by_city_country (dict): Coordinates keyed by (city, country), the first
+            listed city wins when a name repeats within a country.
+        country_timezones (dict): The timezone of every country whose listed cities
+            all share one timezone.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.by_city_state_country: dict[tuple[str, str, str], tuple[float, float]] = {}
+        self.by_city_country: dict[tuple[str, str], tuple[float, float]] = {}
+        timezones_by_country: dict[str, set[Optional[str]]] = {}
+
+        with path.open(encoding="utf-8", newline="") as file:
+            for row in csv.DictReader(file):
+                city = normalize(row["city"])
+                state = normalize(row["state"])
+                country = normalize(row["country"])
+                coordinates = (float(row["latitude"]), float(row["longitude"]))
+
+                self.by_city_state_country[(city, state, country)] = coordinates
+                self.by_city_country.setdefault((city, country), coordinates)
+                timezones_by_country.setdefault(country, set()).add(
+                    _timezone_at(coordinates=coordinates)
+                )
+
+        self.country_timezones: dict[str, str] = {
+            country: next(iter(timezones))
+            for country, timezones in timezones_by_country.items()
+            if len(timezones) == 1 and None not in timezones
+        }
+        logger.info(f"Loaded {len(self.by_city_state_country)} gazetteer entries")
+
+    def get_coordinates(
+        self, city: str, country: str, state: str = ""
+    ) -> Optional[tuple[float, float]]:
+        """
+        Get the coordinates of a city from normalized names.
+
+        Args:
+            city (str): The normalized city name.
+            country (str): The normalized country name.
+            state (str): The normalized state name, may be empty.
+
+        Returns:
+            tuple | None: Latitude and longitude, or None if the city is not listed.
+        """
+        if state and (city, state, country) in self.by_city_state_country:
+            return self.by_city_state_country[(city, state, country)]
+        return self.by_city_country.get((city, country))
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    """
+    Load the bundled gazetteer once per process.
+    """
+    return Gazetteer(path=GAZETTEER_PATH)
+
+
+def normalize(name: Optional[str]) -> str:
+    """
+    Normalize a place name for lookups: strip accents, case and extra whitespace.
+
+    Args:
+        name (str | None): The place name.
+
+    Returns:
+        str: The normalized name, empty for None.
+    """
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+async def get_timezone(
+    city: str, country: str, state: str | None = None
+) -> Optional[str]:
+    """
+    Get the timezone of a location without blocking the event loop.
+
+    Args:
+        city (str): The city name.
+        country (str): The country name.
+        state (str | None): The state or region name (optional).
+
+    Returns:
+        str | None: The timezone of the location, if found.
+    """
+    country = normalize(country)
+    key = (normalize(city), COUNTRY_ALIASES.get(country, country), normalize(state))
+
+    timezone: Optional[str] = timezone_cache.get(key)
+    if timezone is None:
+        timezone = await asyncio.to_thread(_resolve_timezone, *key)
+        if timezone is not None:
+            timezone_cache.set(key, timezone)
+    return timezone
+
+
+def _resolve_timezone(city: str, country: str, state: str) -> Optional[str]:
+    """
+    Resolve the timezone of a location from normalized names.
+
+    The bundled gazetteer is tried first, then the timezone of the country if it has
+    a single one, then Nominatim when GEOCODING_NETWORK_FALLBACK is enabled.
+
+    Args:
+        city (str): The normalized city name.
+        country (str): The normalized country name.
+        state (str): The normalized state name, may be empty.
+
+    Returns:
+        str | None: The timezone of the location, if found.
+    """
+    gazetteer = get_gazetteer()
+
+    coordinates = gazetteer.get_coordinates(city=city, country=country, state=state)
+    if coordinates is None and country in gazetteer.country_timezones:
+        return gazetteer.country_timezones[country]
+    if coordinates is None and settings.GEOCODING_NETWORK_FALLBACK:
+        coordinates = _geocode(city=city, country=country, state=state)
+    if coordinates is None:
+        logger.info(f"Could not resolve the timezone of {city}, {state}, {country}")
+        return None
+
+    return _timezone_at(coordinates=coordinates)
+
+
+def _timezone_at(coordinates: tuple[float, float]) -> Optional[str]:
+    """
+    Get the timezone at a point with the shared TimezoneFinder.
+
+    Args:
+        coordinates (tuple[float, float]): Latitude and longitude.
+
+    Returns:
+        str | None: The timezone at the point, if any.
+    """
+    with _timezone_finder_lock:
+        return _timezone_finder.timezone_at(lat=coordinates[0], lng=coordinates[1])
+
+
+def _geocode(city: str, country: str, state: str = "") -> Optional[tuple[float, float]]:
+    """
+    Get the latitude and longitude of a location from Nominatim.
+
+    Args:
+        city (str): The city name.
+        country (str): The country name.
+        state (str): The state or region name, may be empty.
+
+    Returns:
+        tuple | None: Latitude and longitude as floats, or None if not found.
+    """
+    geolocator = Nominatim(user_agent="expenses-app", timeout=2)
+    location_query = f"{city}, {state}, {country}" if state else f"{city}, {country}"
+
+    try:
+        location = geolocator.geocode(location_query)
+    except Exception as e:
+        logger.error(f"Geocoding {location_query} failed: {e}")
+        return None
+
+    return (location.latitude, location.longitude) if location else None
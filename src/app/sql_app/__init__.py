@@ -4,6 +4,7 @@ from app.sql_app.expense.expense import Expense
 from app.sql_app.expense_name.expense_name import ExpenseName
 from app.sql_app.custom_category.custom_category import CustomCategory
 from app.sql_app.expense_category.expense_category import ExpenseCategory
+from app.sql_app.expense_daily_rollup.expense_daily_rollup import ExpenseDailyRollup
 
 
 __all__ = [
@@ -13,4 +14,5 @@ __all__ = [
     "ExpenseName",
     "CustomCategory",
     "ExpenseCategory",
+    "ExpenseDailyRollup",
 ]
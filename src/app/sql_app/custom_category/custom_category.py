@@ -1,11 +1,12 @@
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.sql_app.database import Base
+from app.sql_app.ids import uuid7
 
 if TYPE_CHECKING:
     from app.sql_app import User, ExpenseCategory
@@ -19,12 +20,19 @@ class CustomCategory(Base):
         id (uuid.UUID): Unique identifier for the custom category.
         name (str): Name of the custom category.
         user_id (uuid.UUID): ID of the user assiciated with this category.
+
+    Constraints:
+        - The name is unique per user, deleted categories included.
     """
 
     __tablename__ = "custom_category"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="unique_custom_category_per_user"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
+        default=uuid7,
         server_default=func.uuid_generate_v4(),
         primary_key=True,
         unique=True,
@@ -37,7 +45,7 @@ class CustomCategory(Base):
     is_deleted: Mapped[bool] = mapped_column(nullable=False, default=False)
 
     user: Mapped["User"] = relationship(
-        "User", back_populates="custom_categories", lazy="joined"
+        "User", back_populates="custom_categories", lazy="raise"
     )
     expense_categories: Mapped[list["ExpenseCategory"]] = relationship(
         "ExpenseCategory", back_populates="custom_category"
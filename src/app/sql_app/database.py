@@ -1,16 +1,55 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncAttrs
-from sqlalchemy import inspect, text
+import time
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.ext.asyncio import (
+    AsyncAttrs,
+    AsyncConnection,
+    AsyncEngine,
+    create_async_engine,
+)
+from sqlalchemy import Connection, NullPool, event, inspect, text
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 
+from app.core import metrics
 from app.core.config import get_settings, Settings
+from app.sql_app import slow_queries
 
 
 settings: Settings = get_settings()
 DATABASE_URL = settings.DATABASE_URL
-
-engine = create_async_engine(DATABASE_URL, echo=True)
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+MIGRATIONS_LOCK_KEY = 727_001
+
+
+def _connect_args(statement_timeout_ms: int, command_timeout: Optional[float]) -> dict:
+    return {
+        # asyncpg's own cache and the dialect's prepared statement cache, both must
+        # be 0 behind a transaction-pooling pgbouncer.
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "command_timeout": command_timeout,
+        "server_settings": {"statement_timeout": str(statement_timeout_ms)},
+    }
+
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=settings.DB_ECHO,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_connect_args(
+        statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+        command_timeout=settings.DB_COMMAND_TIMEOUT,
+    ),
+)
 
 AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
 
@@ -19,6 +58,24 @@ class Base(DeclarativeBase, AsyncAttrs):
     pass
 
 
+def create_maintenance_engine() -> AsyncEngine:
+    """
+    Create an engine for migrations and maintenance jobs.
+
+    Index builds, advisory lock waits and backfills run longer than any request, so
+    its connections have no statement timeout. They are not pooled either.
+
+    Returns:
+        AsyncEngine: The maintenance engine, to be disposed of by the caller.
+    """
+    return create_async_engine(
+        DATABASE_URL,
+        echo=settings.DB_ECHO,
+        poolclass=NullPool,
+        connect_args=_connect_args(statement_timeout_ms=0, command_timeout=None),
+    )
+
+
 # Dependency
 async def get_db():
     """
@@ -33,51 +90,154 @@ async def get_db():
         yield session
 
 
-async def create_uuid_extension():
+def get_pool_status() -> dict[str, int]:
+    """
+    Get the live connection counts of the engine's pool.
+
+    Returns:
+        dict[str, int]: The pool size and its checked in, checked out and overflow
+            connection counts.
+    """
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context.metrics_start_time = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context.metrics_start_time
+    metrics.record_query(duration)
+    if (
+        slow_queries.is_enabled()
+        and duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS
+        and context.execution_options.get(slow_queries.EXECUTION_OPTION, True)
+    ):
+        slow_queries.record(
+            statement=statement,
+            parameters=parameters,
+            executemany=executemany,
+            duration=duration,
+            engine=engine,
+        )
+
+
+metrics.CallbackMetric(
+    "db_pool_connections",
+    "Connection counts and limits of the database pool.",
+    callback=lambda: [((stat,), value) for stat, value in get_pool_status().items()],
+    label_names=("stat",),
+)
+
+
+async def create_uuid_extension(connection: AsyncConnection):
     """
     Creates the "uuid-ossp" extension in the connected PostgreSQL database if it does not already exist.
 
-    This function establishes a connection to the database using the provided engine,
-    begins a transaction, and executes the SQL command to create the "uuid-ossp" extension.
+    This function executes the SQL command to create the "uuid-ossp" extension on the given connection.
     The "uuid-ossp" extension provides functions to generate universally unique identifiers (UUIDs).
     """
-    async with engine.begin() as connection:
-        await connection.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"'))
+    await connection.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"'))
 
 
-async def create_tables():
+async def create_pg_trgm_extension(connection: AsyncConnection):
+    """
+    Creates the "pg_trgm" extension in the connected PostgreSQL database if it does not already exist.
+
+    The "pg_trgm" extension provides the trigram operator classes used by the GIN indexes
+    that serve the ILIKE substring searches on expense and category names.
+    """
+    await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
+async def create_tables(connection: AsyncConnection):
     """
     Create all tables in the database.
 
     This function uses SQLAlchemy's metadata to create all tables that are defined
-    in the Base class. It binds the metadata to the specified engine and creates
-    the tables if they do not already exist.
+    in the Base class on the given connection, if they do not already exist.
     """
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await connection.run_sync(Base.metadata.create_all)
 
 
-async def is_database_initialized() -> bool:
+async def is_database_initialized(connection: AsyncConnection) -> bool:
     """
     Check if the database is already initialized by inspecting its tables.
 
     Returns:
         bool: True if tables exist, False otherwise.
     """
-    async with engine.connect() as connection:
-        result = await connection.run_sync(
-            lambda sync_connection: inspect(sync_connection).get_table_names()
-        )
-        return len(result) > 0
+    result = await connection.run_sync(
+        lambda sync_connection: inspect(sync_connection).get_table_names()
+    )
+    return len(result) > 0
+
+
+async def run_migrations(connection: AsyncConnection, stamp: bool = False):
+    """
+    Upgrade the database to the latest migration in app/sql_app/migrations.
+
+    Args:
+        connection (AsyncConnection): The connection to run the migrations on.
+        stamp (bool): Only mark the database as being at the latest migration, used
+            when the tables were just created from the models.
+    """
+
+    def _run(sync_connection: Connection):
+        config = Config()
+        config.set_main_option("script_location", str(MIGRATIONS_DIR))
+        config.attributes["connection"] = sync_connection
+        if stamp:
+            command.stamp(config, "head")
+        else:
+            command.upgrade(config, "head")
+
+    await connection.run_sync(_run)
 
 
 async def initialize_database():
     """
-    Initialize the database by creating the tables and the "uuid-ossp" extension.
+    Initialize the database schema.
 
-    This function calls the create_tables() and create_uuid_extension() functions
-    to create the necessary tables and enable the "uuid-ossp" extension in the database.
+    A new database gets the "uuid-ossp" and "pg_trgm" extensions and all tables
+    created from the models and is stamped with the latest migration. An existing
+    database is upgraded to the latest migration. A Postgres advisory lock
+    serializes concurrent workers.
+
+    Runs on a maintenance engine, without the statement timeout of the requests.
     """
-    if not await is_database_initialized():
-        await create_uuid_extension()
-        await create_tables()
+    maintenance_engine: AsyncEngine = create_maintenance_engine()
+    try:
+        await _initialize_database(maintenance_engine)
+    finally:
+        await maintenance_engine.dispose()
+
+
+async def _initialize_database(maintenance_engine: AsyncEngine):
+    async with maintenance_engine.connect() as connection:
+        await connection.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATIONS_LOCK_KEY}
+        )
+        await connection.commit()
+        try:
+            initialized: bool = await is_database_initialized(connection)
+            if not initialized:
+                await create_uuid_extension(connection)
+                await create_pg_trgm_extension(connection)
+                await create_tables(connection)
+            await connection.commit()
+            await run_migrations(connection, stamp=not initialized)
+        finally:
+            await connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATIONS_LOCK_KEY}
+            )
+            await connection.commit()
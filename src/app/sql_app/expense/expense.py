@@ -2,11 +2,12 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Numeric, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Numeric, desc, func, text
 from sqlalchemy.dialects.postgresql import UUID, TEXT
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.sql_app.database import Base
+from app.sql_app.ids import uuid7
 
 if TYPE_CHECKING:
     from app.sql_app import User, ExpenseName
@@ -31,9 +32,23 @@ class Expense(Base):
     """
 
     __tablename__ = "expense"
+    __table_args__ = (
+        Index(
+            "ix_expense_user_id_date",
+            "user_id",
+            desc("date"),
+            desc("id"),
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index("ix_expense_user_id_amount", "user_id", "amount"),
+    )
+    # Fetch the server generated timestamps with RETURNING on INSERT and UPDATE
+    # instead of a SELECT afterwards.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
+        default=uuid7,
         server_default=func.uuid_generate_v4(),
         primary_key=True,
         unique=True,
@@ -60,8 +75,6 @@ class Expense(Base):
     is_deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
     name: Mapped["ExpenseName"] = relationship(
-        "ExpenseName", back_populates="expenses", lazy="joined"
-    )
-    user: Mapped["User"] = relationship(
-        "User", back_populates="expenses", lazy="joined"
+        "ExpenseName", back_populates="expenses", lazy="raise"
     )
+    user: Mapped["User"] = relationship("User", back_populates="expenses", lazy="raise")
@@ -1,11 +1,12 @@
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, CheckConstraint, func
+from sqlalchemy import ForeignKey, CheckConstraint, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.sql_app.database import Base
+from app.sql_app.ids import uuid7
 
 if TYPE_CHECKING:
     from app.sql_app import Category, CustomCategory, ExpenseName
@@ -31,10 +32,17 @@ class ExpenseCategory(Base):
             "(global_category_id IS NULL AND custom_category_id IS NOT NULL)",
             name="check_only_one_category",
         ),
+        Index(
+            "ix_expense_category_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
+        default=uuid7,
         server_default=func.uuid_generate_v4(),
         primary_key=True,
         unique=True,
@@ -0,0 +1,36 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.sql_app.database import Base
+
+
+class ExpenseDailyRollup(Base):
+    """
+    Represents the per-day expense totals of a user in a category.
+
+    The rows are maintained by the expense write paths in the same transaction as the
+    expense itself and can be recomputed from the expense table at any time.
+
+    Attributes:
+        user_id (uuid.UUID): Identifier for the associated user.
+        expense_category_id (uuid.UUID): Identifier for the associated expense category.
+        day (date): The UTC day the expenses were incurred on.
+        total (float): Sum of the amounts of the non-deleted expenses.
+        count (int): Number of the non-deleted expenses.
+    """
+
+    __tablename__ = "expense_daily_rollup"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("user.id"), primary_key=True
+    )
+    expense_category_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("expense_category.id"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    total: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
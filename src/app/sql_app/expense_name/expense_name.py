@@ -1,11 +1,12 @@
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, UniqueConstraint, func
+from sqlalchemy import ForeignKey, Index, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.sql_app.database import Base
+from app.sql_app.ids import uuid7
 
 if TYPE_CHECKING:
     from app.sql_app import Expense, User, ExpenseCategory
@@ -33,10 +34,18 @@ class ExpenseName(Base):
             "user_id",
             name="unique_expense_name_per_user_and_category",
         ),
+        Index("ix_expense_name_user_id_name", "user_id", "name"),
+        Index(
+            "ix_expense_name_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
+        default=uuid7,
         server_default=func.uuid_generate_v4(),
         primary_key=True,
         unique=True,
@@ -51,15 +60,15 @@ class ExpenseName(Base):
     name: Mapped[str] = mapped_column(nullable=False)
 
     user: Mapped["User"] = relationship(
-        "User", back_populates="expense_names", lazy="joined"
+        "User", back_populates="expense_names", lazy="raise"
     )
     category: Mapped["ExpenseCategory"] = relationship(
-        "ExpenseCategory", back_populates="expense_names", lazy="joined"
+        "ExpenseCategory", back_populates="expense_names", lazy="raise"
     )
     expenses: Mapped[list["Expense"]] = relationship(
         "Expense",
         back_populates="name",
         uselist=True,
         collection_class=list,
-        lazy="joined",
+        lazy="raise",
     )
@@ -0,0 +1,51 @@
+"""
+Named loading strategies for Expense queries.
+
+The relationships of Expense, ExpenseName and CustomCategory are declared with
+lazy="raise", so every query states what it loads by opting into a profile:
+
+    select(Expense).options(*load_profile("detail"))
+
+Accessing a relationship that the profile did not load raises instead of silently
+emitting another query.
+"""
+
+from typing import Literal
+
+from sqlalchemy.orm import joinedload, raiseload
+from sqlalchemy.sql.base import ExecutableOption
+
+from app.sql_app.expense.expense import Expense
+from app.sql_app.expense_name.expense_name import ExpenseName
+
+LoadProfileName = Literal["detail", "update"]
+
+LOAD_PROFILES: dict[LoadProfileName, tuple[ExecutableOption, ...]] = {
+    # A single expense rendered as an ExpenseResponse: the name, its category and
+    # the owner for the timezone.
+    "detail": (
+        joinedload(Expense.name, innerjoin=True).joinedload(
+            ExpenseName.category, innerjoin=True
+        ),
+        joinedload(Expense.user, innerjoin=True),
+        raiseload("*"),
+    ),
+    # An expense being deleted: the name, whose category the rollup is keyed by.
+    "update": (
+        joinedload(Expense.name, innerjoin=True),
+        raiseload("*"),
+    ),
+}
+
+
+def load_profile(name: LoadProfileName) -> tuple[ExecutableOption, ...]:
+    """
+    Get the loader options of a named load profile.
+
+    Args:
+        name (str): "detail" or "update".
+
+    Returns:
+        tuple[ExecutableOption, ...]: The options to pass to Select.options().
+    """
+    return LOAD_PROFILES[name]
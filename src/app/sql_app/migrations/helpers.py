@@ -0,0 +1,37 @@
+"""
+Helpers shared by the migration revisions.
+"""
+
+import sqlalchemy as sa
+from alembic import context, op
+
+
+def drop_invalid_index(index_name: str, table_name: str) -> None:
+    """
+    Drop an index left invalid by an interrupted CONCURRENTLY build.
+
+    An invalid index is still there, so the IF NOT EXISTS build would skip it and
+    leave an index the planner never uses. Must run in an autocommit block, before
+    the build. Offline SQL cannot check for it.
+
+    Args:
+        index_name (str): The name of the index.
+        table_name (str): The table of the index.
+    """
+    if context.is_offline_mode():
+        return
+
+    invalid = op.get_bind().scalar(
+        sa.text(
+            "SELECT NOT indisvalid FROM pg_index "
+            "WHERE indexrelid = to_regclass(:index_name)"
+        ),
+        {"index_name": index_name},
+    )
+    if invalid:
+        op.drop_index(
+            index_name,
+            table_name=table_name,
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
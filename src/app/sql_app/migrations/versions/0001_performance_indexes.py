@@ -0,0 +1,100 @@
+"""Daily rollup for pre-migration databases and performance indexes
+
+Brings databases created before the migration pipeline up to date: creates and
+backfills expense_daily_rollup if it is missing, then adds the secondary indexes
+used by the expense listings and the expense name lookup. The indexes are built
+CONCURRENTLY so the revision can be applied to a live database, an index left
+invalid by an interrupted build is dropped and built again.
+
+The downgrade drops expense_daily_rollup as well, returning to the schema of the
+pre-migration databases. The rollup is not maintained below this revision, so
+upgrading again recreates and backfills it instead of keeping stale rows.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.sql_app.migrations.helpers import drop_invalid_index
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS expense_daily_rollup (
+            user_id UUID NOT NULL REFERENCES "user" (id),
+            expense_category_id UUID NOT NULL REFERENCES expense_category (id),
+            day DATE NOT NULL,
+            total NUMERIC(14, 2) NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, expense_category_id, day)
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO expense_daily_rollup (user_id, expense_category_id, day, total, count)
+        SELECT expense.user_id, expense_name.category_id,
+               date(timezone('UTC', expense.date)),
+               sum(expense.amount), count(expense.id)
+        FROM expense JOIN expense_name ON expense.name_id = expense_name.id
+        WHERE NOT expense.is_deleted
+          AND NOT EXISTS (SELECT 1 FROM expense_daily_rollup)
+        GROUP BY 1, 2, 3
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        drop_invalid_index("ix_expense_user_id_date", "expense")
+        op.create_index(
+            "ix_expense_user_id_date",
+            "expense",
+            ["user_id", sa.text("date DESC"), sa.text("id DESC")],
+            postgresql_where=sa.text("NOT is_deleted"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        drop_invalid_index("ix_expense_user_id_amount", "expense")
+        op.create_index(
+            "ix_expense_user_id_amount",
+            "expense",
+            ["user_id", "amount"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        drop_invalid_index("ix_expense_name_user_id_name", "expense_name")
+        op.create_index(
+            "ix_expense_name_user_id_name",
+            "expense_name",
+            ["user_id", "name"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, table_name in (
+            ("ix_expense_name_user_id_name", "expense_name"),
+            ("ix_expense_user_id_amount", "expense"),
+            ("ix_expense_user_id_date", "expense"),
+        ):
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    op.execute("DROP TABLE IF EXISTS expense_daily_rollup")
@@ -0,0 +1,66 @@
+"""Trigram indexes for the expense name and category substring searches
+
+Enables pg_trgm and adds GIN trigram indexes on expense_name.name and
+expense_category.name, so the ILIKE '%...%' filters of the expense listing can
+use bitmap index scans. The indexes are built CONCURRENTLY, an index left invalid
+by an interrupted build is dropped and built again.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.sql_app.migrations.helpers import drop_invalid_index
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        drop_invalid_index("ix_expense_name_name_trgm", "expense_name")
+        op.create_index(
+            "ix_expense_name_name_trgm",
+            "expense_name",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        drop_invalid_index("ix_expense_category_name_trgm", "expense_category")
+        op.create_index(
+            "ix_expense_category_name_trgm",
+            "expense_category",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_expense_category_name_trgm",
+            table_name="expense_category",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_expense_name_name_trgm",
+            table_name="expense_name",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,84 @@
+"""Unique custom category names per user
+
+Adds a unique constraint on custom_category (user_id, name), so concurrent
+creations of the same category resolve with INSERT ... ON CONFLICT instead of a
+lookup in the per-worker category cache. Duplicates created before are kept under a
+new name, "<name> (<first 8 characters of the id>)", the category a name lookup
+returned so far, the one that is not deleted and then the lowest id, keeps its
+name. The unique index is built CONCURRENTLY and then attached as the constraint.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.sql_app.migrations.helpers import drop_invalid_index
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONSTRAINT_NAME = "unique_custom_category_per_user"
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        WITH ranked AS (
+            SELECT id, row_number() OVER (
+                PARTITION BY user_id, name ORDER BY is_deleted, id
+            ) AS position
+            FROM custom_category
+        ),
+        renamed AS (
+            UPDATE custom_category
+            SET name = custom_category.name || ' (' || left(custom_category.id::text, 8) || ')'
+            FROM ranked
+            WHERE ranked.id = custom_category.id AND ranked.position > 1
+            RETURNING custom_category.id, custom_category.name
+        )
+        UPDATE expense_category
+        SET name = renamed.name
+        FROM renamed
+        WHERE expense_category.custom_category_id = renamed.id
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        drop_invalid_index(CONSTRAINT_NAME, "custom_category")
+        op.create_index(
+            CONSTRAINT_NAME,
+            "custom_category",
+            ["user_id", "name"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+    op.execute(
+        f"""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = '{CONSTRAINT_NAME}'
+            ) THEN
+                ALTER TABLE custom_category
+                ADD CONSTRAINT {CONSTRAINT_NAME} UNIQUE USING INDEX {CONSTRAINT_NAME};
+            END IF;
+        END
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        f"ALTER TABLE custom_category DROP CONSTRAINT IF EXISTS {CONSTRAINT_NAME}"
+    )
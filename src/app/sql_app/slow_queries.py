@@ -0,0 +1,247 @@
+"""
+The slow-query log.
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are written as JSON lines to
+SLOW_QUERY_LOG_PATH, rotated by size: the normalized SQL, the types of the bind
+parameters (never their values), the duration and the service function that ran the
+statement.
+
+With SLOW_QUERY_EXPLAIN, read-only statements are run again under
+EXPLAIN (ANALYZE, BUFFERS) on a separate connection, at most once per normalized
+statement every SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS, and the plan is added to the
+record. Statements executed with the execution option slow_query_log=False, like the
+EXPLAIN itself, are never logged.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from threading import Lock
+from typing import Any, Optional
+
+import greenlet
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import Settings, get_settings
+
+settings: Settings = get_settings()
+logger = logging.getLogger(__name__)
+
+EXECUTION_OPTION = "slow_query_log"
+SERVICES_PACKAGE = "app.services."
+SERVICE_UTILS_PACKAGE = "app.services.utils."
+MAX_EXPLAINED_STATEMENTS = 1_000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.])\d+(?:\.\d+)?\b")
+_VALUE = r"(?:\$\d+|\?)(?:::\w+(?:\[\])?)?"
+_VALUE_LIST = re.compile(rf"\(\s*{_VALUE}(?:\s*,\s*{_VALUE})+\s*\)")
+_REPEATED_VALUE_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+_LOCKING_CLAUSE = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b", re.I
+)
+
+_file_logger: Optional[logging.Logger] = None
+_explained: dict[str, float] = {}
+_explained_lock = Lock()
+
+
+def is_enabled() -> bool:
+    """
+    Check whether the slow-query log is configured.
+
+    Returns:
+        bool: True if SLOW_QUERY_LOG_PATH is set.
+    """
+    return settings.SLOW_QUERY_LOG_PATH is not None
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Normalize a statement so executions that only differ by their values match.
+
+    Literals are replaced by ?, lists of values, like an expanded IN or the rows of
+    a multi-row INSERT, are collapsed to (...) and whitespace is collapsed.
+
+    Args:
+        statement (str): The statement as sent to the driver.
+
+    Returns:
+        str: The normalized statement.
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _VALUE_LIST.sub("(...)", statement)
+    statement = _REPEATED_VALUE_LISTS.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def parameter_shape(parameters: Any, executemany: bool) -> dict[str, Any]:
+    """
+    Describe the bind parameters of a statement by their types.
+
+    Args:
+        parameters (Any): The parameters as sent to the driver.
+        executemany (bool): Whether the statement ran once per parameter set.
+
+    Returns:
+        dict[str, Any]: The number of parameter sets and the type names of the
+            first one.
+    """
+    parameter_sets = list(parameters) if executemany else [parameters]
+    first = parameter_sets[0] if parameter_sets else ()
+    if isinstance(first, dict):
+        types: Any = {key: type(value).__name__ for key, value in first.items()}
+    else:
+        types = [type(value).__name__ for value in first or ()]
+    return {"sets": len(parameter_sets), "types": types}
+
+
+def find_caller() -> Optional[str]:
+    """
+    Find the service function that executed the current statement.
+
+    The ORM runs statements in a greenlet, the frames of the awaiting coroutines are
+    reached through the parent greenlet.
+
+    Returns:
+        str | None: The innermost service function, e.g.
+            expense_service.get_user_expenses, or None outside of the services.
+    """
+    frame = sys._getframe(1)
+    current = greenlet.getcurrent()
+    while frame is not None or current is not None:
+        while frame is not None:
+            module: str = frame.f_globals.get("__name__", "")
+            if module.startswith(SERVICES_PACKAGE) and not module.startswith(
+                SERVICE_UTILS_PACKAGE
+            ):
+                return f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+            frame = frame.f_back
+        current = current.parent if current is not None else None
+        frame = current.gr_frame if current is not None else None
+    return None
+
+
+def record(
+    statement: str,
+    parameters: Any,
+    executemany: bool,
+    duration: float,
+    engine: AsyncEngine,
+) -> None:
+    """
+    Log a statement that ran over the threshold, explaining it first if enabled.
+
+    Args:
+        statement (str): The statement as sent to the driver.
+        parameters (Any): The parameters as sent to the driver.
+        executemany (bool): Whether the statement ran once per parameter set.
+        duration (float): The execution time in seconds.
+        engine (AsyncEngine): The engine to run the EXPLAIN on.
+    """
+    normalized_sql: str = normalize_sql(statement)
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(duration * 1000, 3),
+        "caller": find_caller(),
+        "sql": normalized_sql,
+        "parameters": parameter_shape(parameters, executemany),
+    }
+
+    if _should_explain(statement, executemany, normalized_sql):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            # A fresh context keeps the EXPLAIN out of the request's query stats.
+            loop.create_task(
+                _explain_and_write(statement, parameters, entry, engine),
+                context=contextvars.Context(),
+            )
+            return
+
+    _write(entry)
+
+
+def _should_explain(statement: str, executemany: bool, normalized_sql: str) -> bool:
+    # EXPLAIN ANALYZE executes the statement, only plain reads are run again. A
+    # locking read would wait for the locks its own transaction still holds.
+    if not settings.SLOW_QUERY_EXPLAIN or executemany:
+        return False
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return False
+    if _LOCKING_CLAUSE.search(statement):
+        return False
+
+    now: float = time.monotonic()
+    with _explained_lock:
+        explained_at: Optional[float] = _explained.get(normalized_sql)
+        if (
+            explained_at is not None
+            and now - explained_at < settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS
+        ):
+            return False
+        if len(_explained) >= MAX_EXPLAINED_STATEMENTS:
+            _explained.clear()
+        _explained[normalized_sql] = now
+    return True
+
+
+async def _explain_and_write(
+    statement: str, parameters: Any, entry: dict[str, Any], engine: AsyncEngine
+) -> None:
+    """
+    Run a statement under EXPLAIN (ANALYZE, BUFFERS) and log it with its plan.
+
+    The EXPLAIN runs in a transaction that is rolled back.
+
+    Args:
+        statement (str): The statement as sent to the driver.
+        parameters (Any): The parameters as sent to the driver.
+        entry (dict[str, Any]): The slow-query record.
+        engine (AsyncEngine): The engine to run the EXPLAIN on.
+    """
+    try:
+        async with engine.connect() as connection:
+            connection = await connection.execution_options(**{EXECUTION_OPTION: False})
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+            )
+            plan: Any = result.scalar_one()
+            await connection.rollback()
+        entry["plan"] = json.loads(plan) if isinstance(plan, str) else plan
+    except Exception as e:
+        logger.warning(f"Could not explain slow query: {e}")
+        entry["explain_error"] = str(e)
+
+    _write(entry)
+
+
+def _write(entry: dict[str, Any]) -> None:
+    global _file_logger
+
+    if _file_logger is None:
+        handler = RotatingFileHandler(
+            settings.SLOW_QUERY_LOG_PATH,
+            maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+            encoding="utf-8",
+            delay=True,
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        file_logger = logging.getLogger(f"{__name__}.file")
+        file_logger.setLevel(logging.INFO)
+        file_logger.propagate = False
+        file_logger.addHandler(handler)
+        _file_logger = file_logger
+
+    _file_logger.info(json.dumps(entry, default=str))
@@ -2,11 +2,12 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, String, func
+from sqlalchemy import BigInteger, Boolean, DateTime, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.sql_app.database import Base
+from app.sql_app.ids import uuid7
 
 if TYPE_CHECKING:
     from app.sql_app import Expense, ExpenseName, CustomCategory
@@ -26,15 +27,20 @@ class User(Base):
         is_admin (bool): Indicates if the user is an admin. Default = False.
         is_deleted (bool): Indicates if the user is deleted. Default = False.
         google_id (str): Google ID of the user, if applicable.
+        data_version (int): Bumped by every write to the user's expenses and
+            categories, the ETags of the user's responses are derived from it.
 
     Relationships:
         expenses (list[Expense]): The expenses associated with this user.
     """
 
     __tablename__ = "user"
+    # Fetch the server generated created_at with RETURNING on INSERT.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
+        default=uuid7,
         server_default=func.uuid_generate_v4(),
         primary_key=True,
         unique=True,
@@ -50,6 +56,9 @@ class User(Base):
     is_admin: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     is_deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     google_id: Mapped[str] = mapped_column(String, nullable=True, unique=True)
+    data_version: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0, server_default="0"
+    )
 
     expenses: Mapped[list["Expense"]] = relationship(
         "Expense", back_populates="user", uselist=True, collection_class=list
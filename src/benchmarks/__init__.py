@@ -0,0 +1,7 @@
+"""
+Benchmarks for the expenses-app services.
+
+Every module is runnable from the src directory, e.g.:
+
+    python -m benchmarks.analysis_aggregation --expenses 50000
+"""
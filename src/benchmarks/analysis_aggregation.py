@@ -0,0 +1,131 @@
+"""
+Compare the pandas category aggregation, the SQL GROUP BY over the expense table and
+the SQL GROUP BY over the daily rollup.
+
+Usage:
+    python -m benchmarks.analysis_aggregation --expenses 50000 --repeat 10
+"""
+
+import asyncio
+from argparse import ArgumentParser
+from uuid import UUID
+
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only
+
+from app.schemas.common.enum import TimePeriod
+from app.services import data_analysis_service
+from app.services.expense_service import filter_by_time_period
+from app.sql_app.database import AsyncSessionLocal
+from app.sql_app.expense.expense import Expense
+from app.sql_app.expense_category.expense_category import ExpenseCategory
+from app.sql_app.expense_name.expense_name import ExpenseName
+from benchmarks.common import cleanup_user, measure, report, seed_user
+
+
+async def pandas_aggregation(
+    user_id: UUID, time_period: TimePeriod, db: AsyncSession
+) -> dict:
+    """
+    The previous implementation: load every Expense entity and group in pandas.
+    """
+    query = (
+        select(Expense)
+        .options(
+            load_only(Expense.id, Expense.date, Expense.amount),
+            joinedload(Expense.name, innerjoin=True)
+            .load_only(ExpenseName.id)
+            .joinedload(ExpenseName.category, innerjoin=True)
+            .load_only(ExpenseCategory.id, ExpenseCategory.name),
+        )
+        .filter(Expense.user_id == user_id, Expense.is_deleted == False)
+    )
+    query = await filter_by_time_period(query=query, time_period=time_period)
+    result = await db.execute(query)
+    expenses: list[Expense] = result.scalars().unique()
+
+    df = pd.DataFrame(
+        [
+            {
+                "date": expense.date,
+                "amount": float(expense.amount),
+                "category": expense.name.category.name,
+            }
+            for expense in expenses
+        ]
+    )
+    if df.empty:
+        return {"total_expenses": []}
+
+    category_expenses = df.groupby("category")["amount"].sum().reset_index()
+    return {"total_expenses": category_expenses.to_dict(orient="records")}
+
+
+async def expense_scan_aggregation(
+    user_id: UUID, time_period: TimePeriod, db: AsyncSession
+) -> dict:
+    """
+    GROUP BY category over the expense table.
+    """
+    query = (
+        select(ExpenseCategory.name, func.sum(Expense.amount))
+        .select_from(Expense)
+        .join(ExpenseName, Expense.name_id == ExpenseName.id)
+        .join(ExpenseCategory, ExpenseName.category_id == ExpenseCategory.id)
+        .filter(Expense.user_id == user_id, Expense.is_deleted == False)
+    )
+    query = await filter_by_time_period(query=query, time_period=time_period)
+    result = await db.execute(
+        query.group_by(ExpenseCategory.name).order_by(ExpenseCategory.name)
+    )
+    return {
+        "total_expenses": [
+            {"category": category, "amount": float(amount)}
+            for category, amount in result.all()
+        ]
+    }
+
+
+async def rollup_aggregation(
+    user_id: UUID, time_period: TimePeriod, db: AsyncSession
+) -> dict:
+    """
+    GROUP BY category over the daily rollup, as served by the analysis endpoint.
+    """
+    return await data_analysis_service.analyze_expenses_time_period(
+        user_id=user_id, time_period=time_period, db=db
+    )
+
+
+async def main(expenses: int, repeat: int) -> None:
+    async with AsyncSessionLocal() as db:
+        user_id = await seed_user(db=db, expenses=expenses)
+        print(f"Seeded {expenses} expenses for user {user_id}")
+
+        try:
+            for time_period in (TimePeriod.MONTH, TimePeriod.YEAR):
+                for label, fn in (
+                    ("pandas", pandas_aggregation),
+                    ("sql expense scan", expense_scan_aggregation),
+                    ("sql daily rollup", rollup_aggregation),
+                ):
+
+                    async def _run():
+                        db.expunge_all()
+                        return await fn(user_id=user_id, time_period=time_period, db=db)
+
+                    timings = await measure(_run, repeat=repeat)
+                    report(f"{label} / {time_period.value}", timings)
+        finally:
+            await cleanup_user(db=db, user_id=user_id)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--expenses", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    config = parser.parse_args()
+
+    asyncio.run(main(expenses=config.expenses, repeat=config.repeat))
@@ -0,0 +1,183 @@
+"""
+Shared helpers for seeding benchmark data and reporting timings.
+"""
+
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import rollup_service
+from app.sql_app.category.category import Category
+from app.sql_app.custom_category.custom_category import CustomCategory
+from app.sql_app.expense.expense import Expense
+from app.sql_app.expense_category.expense_category import ExpenseCategory
+from app.sql_app.expense_daily_rollup.expense_daily_rollup import ExpenseDailyRollup
+from app.sql_app.expense_name.expense_name import ExpenseName
+from app.sql_app.ids import uuid7
+from app.sql_app.user.user import User
+
+BATCH_SIZE = 5_000
+
+
+async def seed_user(
+    db: AsyncSession,
+    expenses: int,
+    categories: int = 12,
+    names: int = 300,
+    days: int = 3 * 365,
+) -> uuid.UUID:
+    """
+    Create a throwaway user with `expenses` expenses spread over the last `days` days.
+
+    Args:
+        db (AsyncSession): The database session.
+        expenses (int): The number of expenses to create.
+        categories (int): The number of global categories to spread the names over.
+        names (int): The number of distinct expense names.
+        days (int): How far back the expense dates reach.
+
+    Returns:
+        uuid.UUID: The identifier of the seeded user.
+    """
+    suffix = uuid.uuid4().hex[:8]
+    user = User(
+        username=f"bench_{suffix}",
+        email=f"bench_{suffix}@example.com",
+        password="not-a-real-hash",
+        timezone="UTC",
+    )
+    db.add(user)
+    await db.flush()
+
+    category_ids: list[uuid.UUID] = []
+    for index in range(categories):
+        category = Category(name=f"bench_{suffix}_category_{index}")
+        db.add(category)
+        await db.flush()
+        expense_category = ExpenseCategory(
+            global_category_id=category.id, name=category.name
+        )
+        db.add(expense_category)
+        await db.flush()
+        category_ids.append(expense_category.id)
+
+    name_rows = [
+        {
+            "id": uuid7(),
+            "user_id": user.id,
+            "category_id": category_ids[index % categories],
+            "name": f"expense_{index}",
+        }
+        for index in range(names)
+    ]
+    await db.execute(insert(ExpenseName), name_rows)
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for _ in range(expenses):
+        rows.append(
+            {
+                "id": uuid7(),
+                "user_id": user.id,
+                "name_id": random.choice(name_rows)["id"],
+                "date": now - timedelta(minutes=random.randint(0, days * 24 * 60)),
+                "amount": round(random.uniform(1, 500), 2),
+                "is_deleted": random.random() < 0.02,
+            }
+        )
+        if len(rows) == BATCH_SIZE:
+            await db.execute(insert(Expense), rows)
+            rows = []
+    if rows:
+        await db.execute(insert(Expense), rows)
+
+    await rollup_service.rebuild_rollup(db=db, user_id=user.id)
+    await db.commit()
+    return user.id
+
+
+async def cleanup_user(db: AsyncSession, user_id: uuid.UUID) -> None:
+    """
+    Remove everything created by `seed_user`, and the custom categories the
+    benchmark created for the user.
+
+    Args:
+        db (AsyncSession): The database session.
+        user_id (uuid.UUID): The identifier of the seeded user.
+    """
+    category_ids = (
+        (
+            await db.execute(
+                select(ExpenseName.category_id).filter(ExpenseName.user_id == user_id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    global_ids = (
+        (
+            await db.execute(
+                select(ExpenseCategory.global_category_id).filter(
+                    ExpenseCategory.id.in_(category_ids)
+                )
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    await db.execute(
+        delete(ExpenseDailyRollup).filter(ExpenseDailyRollup.user_id == user_id)
+    )
+    await db.execute(delete(Expense).filter(Expense.user_id == user_id))
+    await db.execute(delete(ExpenseName).filter(ExpenseName.user_id == user_id))
+    custom_ids = select(CustomCategory.id).filter(CustomCategory.user_id == user_id)
+    await db.execute(
+        delete(ExpenseCategory).filter(
+            ExpenseCategory.id.in_(category_ids)
+            | ExpenseCategory.custom_category_id.in_(custom_ids)
+        )
+    )
+    await db.execute(delete(CustomCategory).filter(CustomCategory.user_id == user_id))
+    await db.execute(delete(Category).filter(Category.id.in_(global_ids)))
+    await db.execute(delete(User).filter(User.id == user_id))
+    await db.commit()
+
+
+async def measure(fn: Callable[[], Awaitable], repeat: int) -> list[float]:
+    """
+    Await `fn` `repeat` times and collect the wall-clock duration of every call.
+
+    Args:
+        fn (Callable[[], Awaitable]): The coroutine function to measure.
+        repeat (int): How many times to call it.
+
+    Returns:
+        list[float]: The durations in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list[float]) -> None:
+    """
+    Print the median, mean and best timing of a benchmark case.
+
+    Args:
+        label (str): The name of the benchmark case.
+        timings (list[float]): The durations in milliseconds.
+    """
+    print(
+        f"{label:<40} median {statistics.median(timings):9.2f} ms   "
+        f"mean {statistics.mean(timings):9.2f} ms   best {min(timings):9.2f} ms"
+    )
@@ -0,0 +1,126 @@
+"""
+Compare the per-row ExpenseResponse serialization of expense lists with the batch
+serializer built from column tuples.
+
+Usage:
+    python -m benchmarks.expense_serialization --expenses 10000 --repeat 10
+"""
+
+import asyncio
+import json
+from argparse import ArgumentParser
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, update
+
+from app.schemas.common.common import FilterOptions
+from app.schemas.expense import (
+    ExpenseResponse,
+    dump_expense_records,
+    to_expense_records,
+)
+from app.services import expense_service
+from app.services.expense_service import EXPENSE_COLUMNS
+from app.sql_app.database import AsyncSessionLocal
+from app.sql_app.expense.expense import Expense
+from app.sql_app.expense_category.expense_category import ExpenseCategory
+from app.sql_app.expense_name.expense_name import ExpenseName
+from app.sql_app.load_profiles import load_profile
+from app.sql_app.user.user import User
+from benchmarks.common import cleanup_user, measure, report, seed_user
+
+TIMEZONE = "Europe/Sofia"
+
+
+def serialize_entities(expenses: list[Expense]) -> bytes:
+    """
+    The previous implementation: ExpenseResponse.create per row, model_dump per item,
+    on entities loaded with their name, category and user.
+    """
+    responses = [ExpenseResponse.create(expense=expense) for expense in expenses]
+    return JSONResponse(
+        content={"detail": [response.model_dump(mode="json") for response in responses]}
+    ).body
+
+
+def serialize_rows(rows: list) -> bytes:
+    """
+    The batch serializer, as used by GET /expenses.
+    """
+    return (
+        b'{"detail":'
+        + dump_expense_records(to_expense_records(rows=rows, timezone=TIMEZONE))
+        + b"}"
+    )
+
+
+async def main(expenses: int, repeat: int) -> None:
+    async with AsyncSessionLocal() as db:
+        user_id = await seed_user(db=db, expenses=expenses)
+        await db.execute(
+            update(User).filter(User.id == user_id).values(timezone=TIMEZONE)
+        )
+        await db.commit()
+        print(f"Seeded {expenses} expenses for user {user_id}")
+
+        try:
+            entity_query = (
+                select(Expense)
+                .options(*load_profile("detail"))
+                .filter(Expense.user_id == user_id)
+                .order_by(Expense.date.desc(), Expense.id.desc())
+            )
+            row_query = (
+                select(*EXPENSE_COLUMNS)
+                .join(ExpenseName, Expense.name_id == ExpenseName.id)
+                .join(ExpenseCategory, ExpenseName.category_id == ExpenseCategory.id)
+                .filter(Expense.user_id == user_id)
+                .order_by(Expense.date.desc(), Expense.id.desc())
+            )
+            entities = list((await db.execute(entity_query)).scalars().unique())
+            rows = list((await db.execute(row_query)).all())
+
+            if json.loads(serialize_entities(entities)) != json.loads(
+                serialize_rows(rows)
+            ):
+                raise AssertionError("The serializers produce different output")
+
+            async def _serialize_entities():
+                return serialize_entities(entities)
+
+            async def _serialize_rows():
+                return serialize_rows(rows)
+
+            report(
+                "serialize / per-row models", await measure(_serialize_entities, repeat)
+            )
+            report("serialize / batch", await measure(_serialize_rows, repeat))
+
+            async def _fetch_entities():
+                db.expunge_all()
+                result = await db.execute(entity_query)
+                return serialize_entities(list(result.scalars().unique()))
+
+            async def _fetch_rows():
+                return await expense_service.get_user_expenses(
+                    user_id=user_id,
+                    filter_options=FilterOptions(limit=expenses),
+                    db=db,
+                )
+
+            report(
+                "fetch + serialize / per-row models",
+                await measure(_fetch_entities, repeat),
+            )
+            report("fetch + serialize / batch", await measure(_fetch_rows, repeat))
+        finally:
+            await cleanup_user(db=db, user_id=user_id)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--expenses", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    config = parser.parse_args()
+
+    asyncio.run(main(expenses=config.expenses, repeat=config.repeat))
@@ -0,0 +1,95 @@
+"""
+Compare encoding list responses through model_dump and JSONResponse with the
+pre-encoded response of process_request.
+
+No database is needed, the expenses and categories are built in memory.
+
+Usage:
+    python -m benchmarks.response_encoding --repeat 200
+"""
+
+import asyncio
+import json
+import random
+import uuid
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse, Response
+
+from app.schemas.category import CategoryResponse
+from app.schemas.expense import ExpenseResponse
+from app.services.utils.processors import _encode_response
+from benchmarks.common import measure, report
+
+SIZES = (10, 100, 1000)
+
+
+def build_expenses(count: int) -> list[ExpenseResponse]:
+    now = datetime.now()
+    return [
+        ExpenseResponse(
+            id=uuid.uuid4(),
+            name=f"expense_{index % 300}",
+            amount=round(random.uniform(1, 500), 2),
+            category=f"category_{index % 12}",
+            date=now - timedelta(minutes=random.randint(0, 365 * 24 * 60)),
+            created_at=now.strftime("%d-%m-%Y %H:%M"),
+            updated_at=now.strftime("%d-%m-%Y %H:%M"),
+            note="Paid by card" if index % 3 else None,
+        )
+        for index in range(count)
+    ]
+
+
+def build_categories(count: int) -> list[CategoryResponse]:
+    return [
+        CategoryResponse(id=uuid.uuid4(), name=f"category_{index}")
+        for index in range(count)
+    ]
+
+
+def encode_dicts(items: list) -> bytes:
+    """
+    The previous pipeline: model_dump per item, re-encoded by JSONResponse.
+    """
+    return JSONResponse(
+        content={"detail": [item.model_dump(mode="json") for item in items]}
+    ).body
+
+
+def encode_bytes(items: list) -> bytes:
+    """
+    The current pipeline, as used by process_request.
+    """
+    return Response(content=_encode_response(items), media_type="application/json").body
+
+
+async def main(repeat: int) -> None:
+    for label, build in (
+        ("expenses", build_expenses),
+        ("categories", build_categories),
+    ):
+        for size in SIZES:
+            items = build(size)
+            if json.loads(encode_dicts(items)) != json.loads(encode_bytes(items)):
+                raise AssertionError("The pipelines produce different output")
+
+            async def _encode_dicts():
+                return encode_dicts(items)
+
+            async def _encode_bytes():
+                return encode_bytes(items)
+
+            report(f"{label} {size} / model_dump", await measure(_encode_dicts, repeat))
+            report(
+                f"{label} {size} / pre-encoded", await measure(_encode_bytes, repeat)
+            )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    config = parser.parse_args()
+
+    asyncio.run(main(repeat=config.repeat))
@@ -0,0 +1,132 @@
+"""
+Show the query plans of the expense name and category substring filters.
+
+Prints EXPLAIN (ANALYZE, BUFFERS) of the previous correlated EXISTS filters and of
+the join-based filters used by the expense listing, plus their timings. The
+join-based filters run twice: first with bitmap scans disabled, the only way the
+planner can use the pg_trgm GIN indexes, which gives the plan without them, then
+normally. With the indexes in place the second plan switches from a sequential scan
+of expense_name to a bitmap index scan on ix_expense_name_name_trgm.
+
+Usage:
+    python -m benchmarks.trigram_search --expenses 200000 --names 50000
+"""
+
+import asyncio
+from argparse import ArgumentParser
+from contextlib import asynccontextmanager, nullcontext
+from typing import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.common.common import FilterOptions
+from app.services.expense_service import filter_expenses
+from app.sql_app.database import AsyncSessionLocal
+from app.sql_app.expense.expense import Expense
+from app.sql_app.expense_category.expense_category import ExpenseCategory
+from app.sql_app.expense_name.expense_name import ExpenseName
+from benchmarks.common import cleanup_user, measure, report, seed_user
+
+
+def exists_query(user_id: UUID, expense_name: str, category: str):
+    """
+    The previous filters: correlated EXISTS subqueries through the relationships.
+    """
+    return select(Expense.id).filter(
+        Expense.user_id == user_id,
+        Expense.is_deleted == False,
+        Expense.name.has(ExpenseName.name.ilike(f"%{expense_name}%")),
+        Expense.name.has(
+            ExpenseName.category.has(ExpenseCategory.name.ilike(f"%{category}%"))
+        ),
+    )
+
+
+async def join_query(user_id: UUID, expense_name: str, category: str, db: AsyncSession):
+    """
+    The current filters: plain joins filtered by filter_expenses.
+    """
+    query = (
+        select(Expense.id)
+        .join(ExpenseName, Expense.name_id == ExpenseName.id)
+        .join(ExpenseCategory, ExpenseName.category_id == ExpenseCategory.id)
+        .filter(Expense.user_id == user_id, Expense.is_deleted == False)
+    )
+    return await filter_expenses(
+        user_id=user_id,
+        query=query,
+        filter_options=FilterOptions(
+            expense_name=expense_name, category=category, end_date=None
+        ),
+        db=db,
+    )
+
+
+@asynccontextmanager
+async def without_trigram_indexes(db: AsyncSession) -> AsyncIterator[None]:
+    """
+    Keep the planner off the GIN trigram indexes, which are only read through
+    bitmap scans, without dropping them.
+    """
+    await db.execute(text("SET enable_bitmapscan = off"))
+    try:
+        yield
+    finally:
+        await db.execute(text("RESET enable_bitmapscan"))
+
+
+async def explain(query, db: AsyncSession) -> str:
+    compiled = query.compile(
+        dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}"))
+    return "\n".join(row[0] for row in result.all())
+
+
+async def main(expenses: int, names: int, repeat: int) -> None:
+    async with AsyncSessionLocal() as db:
+        user_id = await seed_user(db=db, expenses=expenses, names=names)
+        await db.execute(text("ANALYZE expense"))
+        await db.execute(text("ANALYZE expense_name"))
+        await db.execute(text("ANALYZE expense_category"))
+        print(f"Seeded {expenses} expenses with {names} names for user {user_id}")
+
+        expense_name, category = "expense_123", "category_1"
+        try:
+            joined = await join_query(
+                user_id=user_id, expense_name=expense_name, category=category, db=db
+            )
+            for label, query, trigram_indexes in (
+                (
+                    "correlated EXISTS",
+                    exists_query(user_id, expense_name, category),
+                    True,
+                ),
+                ("joins without trigram indexes", joined, False),
+                ("joins", joined, True),
+            ):
+                async with (
+                    nullcontext() if trigram_indexes else without_trigram_indexes(db)
+                ):
+                    print(f"\n--- {label} ---\n{await explain(query=query, db=db)}\n")
+
+                    async def _run():
+                        return (await db.execute(query)).all()
+
+                    report(label, await measure(_run, repeat=repeat))
+        finally:
+            await cleanup_user(db=db, user_id=user_id)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--expenses", type=int, default=200_000)
+    parser.add_argument("--names", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    config = parser.parse_args()
+
+    asyncio.run(
+        main(expenses=config.expenses, names=config.names, repeat=config.repeat)
+    )
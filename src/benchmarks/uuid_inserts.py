@@ -0,0 +1,112 @@
+"""
+Compare inserting expenses keyed by random UUIDv4 ids with time-ordered UUIDv7 ids.
+
+Both runs insert into a temporary copy of the expense table with the same indexes,
+in batches as the batch create endpoint does, and report the insert rate and the
+size of the primary key index afterwards.
+
+Usage:
+    python -m benchmarks.uuid_inserts --expenses 1000000
+"""
+
+import asyncio
+import random
+import time
+import uuid
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import column, insert, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.sql_app.database import engine
+from app.sql_app.ids import uuid7
+
+BATCH_SIZE = 5_000
+
+
+async def insert_expenses(
+    conn: AsyncConnection, table_name: str, expenses: int, new_id: Callable
+) -> tuple[float, int]:
+    """
+    Insert `expenses` rows into a fresh copy of the expense table.
+
+    Args:
+        conn (AsyncConnection): The database connection.
+        table_name (str): The name of the temporary table.
+        expenses (int): The number of expenses to insert.
+        new_id (Callable): The id generator.
+
+    Returns:
+        tuple[float, int]: The insert duration in seconds and the primary key
+            index size in bytes.
+    """
+    await conn.execute(
+        text(
+            f"CREATE TEMP TABLE {table_name} "
+            "(LIKE expense INCLUDING DEFAULTS INCLUDING INDEXES)"
+        )
+    )
+    target = table(
+        table_name,
+        column("id"),
+        column("name_id"),
+        column("user_id"),
+        column("date"),
+        column("amount"),
+        column("is_deleted"),
+    )
+    user_id = uuid.uuid4()
+    name_ids = [uuid.uuid4() for _ in range(300)]
+    now = datetime.now(timezone.utc)
+
+    elapsed = 0.0
+    for offset in range(0, expenses, BATCH_SIZE):
+        rows = [
+            {
+                "id": new_id(),
+                "name_id": random.choice(name_ids),
+                "user_id": user_id,
+                "date": now - timedelta(minutes=random.randint(0, 3 * 365 * 24 * 60)),
+                "amount": round(random.uniform(1, 500), 2),
+                "is_deleted": False,
+            }
+            for _ in range(min(BATCH_SIZE, expenses - offset))
+        ]
+        start = time.perf_counter()
+        await conn.execute(insert(target), rows)
+        elapsed += time.perf_counter() - start
+
+    index_size = await conn.scalar(
+        text(
+            "SELECT pg_relation_size(indexrelid) FROM pg_index "
+            "WHERE indrelid = CAST(:table_name AS regclass) AND indisprimary"
+        ),
+        {"table_name": table_name},
+    )
+    return elapsed, index_size
+
+
+async def main(expenses: int) -> None:
+    async with engine.connect() as conn:
+        for label, table_name, new_id in (
+            ("uuid4", "bench_expense_uuid4", uuid.uuid4),
+            ("uuid7", "bench_expense_uuid7", uuid7),
+        ):
+            elapsed, index_size = await insert_expenses(
+                conn=conn, table_name=table_name, expenses=expenses, new_id=new_id
+            )
+            print(
+                f"{label:<10} {expenses / elapsed:12.0f} rows/s   "
+                f"{elapsed:8.2f} s   primary key {index_size / 2**20:8.1f} MiB"
+            )
+        await conn.rollback()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--expenses", type=int, default=1_000_000)
+    config = parser.parse_args()
+
+    asyncio.run(main(expenses=config.expenses))
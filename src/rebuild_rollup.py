@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Entry point for recomputing the expense_daily_rollup table from the expense table
+"""
+
+import asyncio
+from argparse import ArgumentParser
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import rollup_service
+from app.sql_app.database import create_maintenance_engine
+
+
+async def rebuild(user_id: Optional[UUID]) -> None:
+    # A full rebuild runs longer than the statement timeout of the requests.
+    engine = create_maintenance_engine()
+    try:
+        async with AsyncSession(bind=engine) as db:
+            rows = await rollup_service.rebuild_rollup(db=db, user_id=user_id)
+            await db.commit()
+    finally:
+        await engine.dispose()
+    print(f"Rebuilt {rows} rollup rows for {user_id or 'all users'}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "-u",
+        "--user-id",
+        type=UUID,
+        default=None,
+        help="rebuild only the rows of this user (default: all users)",
+    )
+    config = parser.parse_args()
+
+    asyncio.run(rebuild(user_id=config.user_id))
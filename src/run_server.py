@@ -1,14 +1,79 @@
+#!/usr/bin/env python3
 """
 Entry point for running server
+
+Development (the default) runs a single process that reloads on code changes:
+
+    python run_server.py --reload app/
+
+Production runs several worker processes on uvloop and httptools, without reload:
+
+    python run_server.py --production --workers 4 --preload
 """
-#!/usr/bin/env python3
 
-from argparse import ArgumentParser
+import importlib
+import importlib.util
+import logging
+import os
+from argparse import ArgumentParser, Namespace
 
 import uvicorn
 
+APP = "app.main:app"
+
+logger = logging.getLogger(__name__)
+
 config = None
 
+
+def _default_workers() -> int:
+    return int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+
+def _pick(preferred: str, fallback: str) -> str:
+    """
+    Use an optional speedup when it is installed, fall back to the pure Python
+    implementation otherwise.
+    """
+    if importlib.util.find_spec(preferred) is not None:
+        return preferred
+    logger.warning(f"{preferred} is not installed, falling back to {fallback}")
+    return fallback
+
+
+def _run_development(config: Namespace) -> None:
+    reload_dirs = config.reload.split(",") if config.reload else []
+
+    uvicorn.run(
+        APP,
+        host=config.host,
+        port=config.port,
+        reload=True,
+        reload_dirs=reload_dirs,
+    )
+
+
+def _run_production(config: Namespace) -> None:
+    if config.preload:
+        # uvicorn spawns its workers, each imports the app again. Importing it
+        # here once makes a broken configuration fail the start instead of every
+        # worker.
+        importlib.import_module(APP.split(":")[0])
+
+    uvicorn.run(
+        APP,
+        host=config.host,
+        port=config.port,
+        workers=config.workers,
+        loop=_pick("uvloop", "asyncio"),
+        http=_pick("httptools", "h11"),
+        timeout_keep_alive=config.keep_alive,
+        backlog=config.backlog,
+        timeout_graceful_shutdown=config.graceful_timeout,
+        access_log=config.access_log,
+    )
+
+
 if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument(
@@ -26,16 +91,61 @@ if __name__ == "__main__":
         default=8000,
         help="port to listen on (default: 8000)",
     )
+    parser.add_argument(
+        "--host",
+        default="0.0.0.0",
+        help="interface to bind to (default: 0.0.0.0)",
+    )
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="run worker processes on uvloop and httptools, without reload",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=_default_workers(),
+        help="number of worker processes in production "
+        "(default: $WEB_CONCURRENCY or the number of CPUs)",
+    )
+    parser.add_argument(
+        "--keep-alive",
+        type=int,
+        default=5,
+        help="seconds to keep idle connections open (default: 5)",
+    )
+    parser.add_argument(
+        "--backlog",
+        type=int,
+        default=2048,
+        help="maximum number of pending connections (default: 2048)",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=30,
+        help="seconds to let in-flight requests finish on shutdown (default: 30)",
+    )
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="import the app once before starting the workers",
+    )
+    parser.add_argument(
+        "--no-access-log",
+        dest="access_log",
+        action="store_false",
+        help="disable the access log",
+    )
     config = parser.parse_args()
 
-    reload_dirs = config.reload.split(",") if config.reload else []
-    reload_enabled = bool(reload_dirs)
+    if config.production and config.reload:
+        parser.error("--reload is only available in development")
+    if config.workers < 1:
+        parser.error("--workers must be at least 1")
 
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=config.port,
-        # reload=reload_enabled,
-        reload=True,
-        reload_dirs=reload_dirs,
-    )
+    if config.production:
+        _run_production(config)
+    else:
+        _run_development(config)
@@ -0,0 +1,56 @@
+"""
+Admin authorization follows role changes made through other workers, whatever the
+user cache of this one holds.
+
+Needs the database of DATABASE_URL, the tests are skipped when it cannot be reached.
+"""
+
+import asyncio
+import logging
+from uuid import UUID
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.schemas.user import UserResponse
+from app.services import auth_service, user_service
+from app.sql_app.user.user import User
+
+
+def test_a_role_changed_behind_the_cache_applies_at_once(
+    session_factory: async_sessionmaker[AsyncSession], user_id: UUID
+):
+    logging.disable(logging.CRITICAL)
+
+    async def _set_admin(is_admin: bool) -> None:
+        # Another worker changes the role, the cache of this one is left as is.
+        async with session_factory() as db:
+            await db.execute(
+                update(User).filter(User.id == user_id).values(is_admin=is_admin)
+            )
+            await db.commit()
+
+    async def _require_admin() -> None:
+        async with session_factory() as db:
+            user: UserResponse = await user_service.get_by_id(user_id=user_id, db=db)
+            await auth_service.require_admin_role(user=user, db=db)
+
+    async def _run() -> None:
+        await _set_admin(True)
+        await _require_admin()
+        assert user_service.user_cache.get(user_id).is_admin
+
+        await _set_admin(False)
+        with pytest.raises(HTTPException) as error:
+            await _require_admin()
+        assert error.value.status_code == 403
+        # The stale user is dropped, the next request caches the current one.
+        assert user_service.user_cache.get(user_id) is None
+
+    try:
+        asyncio.run(_run())
+    finally:
+        user_service.invalidate_user(user_id=user_id)
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,79 @@
+"""
+The category catalogue of a worker follows writes made through other workers.
+
+Needs the database of DATABASE_URL, the tests are skipped when it cannot be reached.
+"""
+
+import asyncio
+import logging
+from uuid import UUID
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.schemas.common.application_error import ApplicationError
+from app.schemas.expense import ExpenseCreate
+from app.schemas.user import UserResponse
+from app.services import category_service, expense_service, user_service
+from app.sql_app.custom_category.custom_category import CustomCategory
+from app.sql_app.user.user import User
+
+
+def test_a_category_created_behind_the_cache_is_used(
+    session_factory: async_sessionmaker[AsyncSession], user_id: UUID
+):
+    logging.disable(logging.CRITICAL)
+
+    async def _run() -> None:
+        async with session_factory() as db:
+            user = UserResponse.create(user=await db.get(User, user_id))
+            assert "test_catalogue" not in [
+                category.name
+                for category in await category_service.get_all(user=user, db=db)
+            ]
+
+        # Another worker creates the category, the catalogue of this one still
+        # holds the user's categories from before.
+        async with session_factory() as db:
+            async with db.begin():
+                await category_service.get_or_create_custom_categories(
+                    user_id=user_id, names={"test_catalogue"}, db=db
+                )
+                await user_service.bump_data_version(user_id=user_id, db=db)
+
+        async with session_factory() as db:
+            assert "test_catalogue" in [
+                category.name
+                for category in await category_service.get_all(user=user, db=db)
+            ]
+
+            await expense_service.create_expense(
+                user_id=user_id,
+                expense=ExpenseCreate(
+                    name="coffee",
+                    amount=3,
+                    date="01/02/2025 10:00",
+                    category="test_catalogue",
+                ),
+                db=db,
+            )
+            with pytest.raises(ApplicationError):
+                await category_service.create_custom_category(
+                    user_id=user_id, name="test_catalogue", db=db
+                )
+
+            count: int = await db.scalar(
+                select(func.count())
+                .select_from(CustomCategory)
+                .filter(
+                    CustomCategory.user_id == user_id,
+                    CustomCategory.name == "test_catalogue",
+                )
+            )
+            assert count == 1
+
+    try:
+        asyncio.run(_run())
+    finally:
+        logging.disable(logging.NOTSET)
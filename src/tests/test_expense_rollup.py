@@ -0,0 +1,104 @@
+"""
+The daily rollup kept by the expense writes matches the expense table.
+
+Needs the database of DATABASE_URL, the tests are skipped when it cannot be reached.
+"""
+
+import asyncio
+import logging
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.schemas.expense import ExpenseCreate, ExpenseResponse
+from app.services import expense_service, rollup_service
+from app.sql_app.expense.expense import Expense
+from app.sql_app.expense_daily_rollup.expense_daily_rollup import ExpenseDailyRollup
+from app.sql_app.expense_name.expense_name import ExpenseName
+
+
+async def _rollup_rows(user_id: UUID, db: AsyncSession) -> list[tuple]:
+    result = await db.execute(
+        select(
+            ExpenseDailyRollup.expense_category_id,
+            ExpenseDailyRollup.day,
+            ExpenseDailyRollup.total,
+            ExpenseDailyRollup.count,
+        ).filter(ExpenseDailyRollup.user_id == user_id, ExpenseDailyRollup.count != 0)
+    )
+    return sorted(map(tuple, result.all()))
+
+
+async def _expected_rows(user_id: UUID, db: AsyncSession) -> list[tuple]:
+    day = func.date(func.timezone("UTC", Expense.date))
+    result = await db.execute(
+        select(
+            ExpenseName.category_id,
+            day,
+            func.sum(Expense.amount),
+            func.count(Expense.id),
+        )
+        .join(ExpenseName, Expense.name_id == ExpenseName.id)
+        .filter(Expense.user_id == user_id, Expense.is_deleted == False)
+        .group_by(ExpenseName.category_id, day)
+    )
+    return sorted(map(tuple, result.all()))
+
+
+def test_create_uses_the_current_category_of_a_cached_name(
+    session_factory: async_sessionmaker[AsyncSession], user_id: UUID
+):
+    logging.disable(logging.CRITICAL)
+
+    def _expense(name: str, category: str) -> ExpenseCreate:
+        return ExpenseCreate(
+            name=name, amount=4.25, date="01/02/2025 10:00", category=category
+        )
+
+    async def _run() -> None:
+        async with session_factory() as db:
+            await expense_service.create_expense(
+                user_id=user_id, expense=_expense("coffee", "test_rollup_a"), db=db
+            )
+            moved: ExpenseResponse = await expense_service.create_expense(
+                user_id=user_id, expense=_expense("tea", "test_rollup_b"), db=db
+            )
+        cached = expense_service.expense_name_cache.get((user_id, "coffee"))
+        assert cached is not None and cached.category == "test_rollup_a"
+
+        # Another worker moves the name to another category, the cache of this one
+        # still holds the old category.
+        async with session_factory() as db:
+            tea_category_id: UUID = await db.scalar(
+                select(ExpenseName.category_id).filter(
+                    ExpenseName.user_id == user_id, ExpenseName.name == moved.name
+                )
+            )
+            await db.execute(
+                update(ExpenseName)
+                .filter(ExpenseName.id == cached.id)
+                .values(category_id=tea_category_id)
+            )
+            await rollup_service.move_expense_name(
+                user_id=user_id,
+                expense_name_id=cached.id,
+                from_category_id=cached.category_id,
+                to_category_id=tea_category_id,
+                db=db,
+            )
+            await db.commit()
+
+        async with session_factory() as db:
+            created: ExpenseResponse = await expense_service.create_expense(
+                user_id=user_id, expense=_expense("coffee", "test_rollup_a"), db=db
+            )
+            assert created.category == "test_rollup_b"
+            assert await _rollup_rows(user_id=user_id, db=db) == await _expected_rows(
+                user_id=user_id, db=db
+            )
+
+    try:
+        asyncio.run(_run())
+    finally:
+        logging.disable(logging.NOTSET)
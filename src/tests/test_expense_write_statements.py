@@ -0,0 +1,83 @@
+"""
+The statements of the expense write paths, counted so that an extra round trip, like
+reading back a row the write already returned, fails the test.
+
+Needs the database of DATABASE_URL, the tests are skipped when it cannot be reached.
+"""
+
+import asyncio
+import logging
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.schemas.expense import ExpenseCreate, ExpenseResponse, ExpenseUpdate
+from app.services import expense_service
+
+# Expense name and category come from the caches of the worker, the first create
+# of the test fills them.
+EXPECTED_STATEMENTS = {
+    # user timezone, the user's custom categories, reloaded because the first create
+    # added one, expense INSERT, rollup upsert, data_version bump
+    "create": 5,
+    # expense with its name and category, expense UPDATE, two rollup upserts,
+    # data_version bump
+    "update": 5,
+    # expense, expense UPDATE, rollup upsert, data_version bump
+    "delete": 4,
+}
+
+
+def _expense() -> ExpenseCreate:
+    return ExpenseCreate(
+        name="coffee", amount=3.5, date="01/02/2025 10:00", category="test_statements"
+    )
+
+
+def test_expense_write_statement_counts(
+    session_factory: async_sessionmaker[AsyncSession],
+    statements: list[str],
+    user_id: UUID,
+):
+    logging.disable(logging.CRITICAL)
+
+    async def _run() -> dict[str, list[str]]:
+        executed: dict[str, list[str]] = {}
+        async with session_factory() as db:
+            await expense_service.create_expense(
+                user_id=user_id, expense=_expense(), db=db
+            )
+
+            statements.clear()
+            created: ExpenseResponse = await expense_service.create_expense(
+                user_id=user_id, expense=_expense(), db=db
+            )
+            executed["create"] = list(statements)
+            await _assert_current(response=created, db=db)
+
+            statements.clear()
+            updated: ExpenseResponse = await expense_service.update_expense(
+                expense_id=created.id, expense_update=ExpenseUpdate(amount=9), db=db
+            )
+            executed["update"] = list(statements)
+            await _assert_current(response=updated, db=db)
+
+            statements.clear()
+            await expense_service.delete_expense(expense_id=created.id, db=db)
+            executed["delete"] = list(statements)
+        return executed
+
+    try:
+        executed: dict[str, list[str]] = asyncio.run(_run())
+    finally:
+        logging.disable(logging.NOTSET)
+
+    for label, expected in EXPECTED_STATEMENTS.items():
+        assert len(executed[label]) == expected, (label, executed[label])
+
+
+async def _assert_current(response: ExpenseResponse, db: AsyncSession) -> None:
+    # The response is built from the write, it must match the row as stored.
+    db.expunge_all()
+    stored = await expense_service._get_by_id_db(expense_id=response.id, db=db)
+    assert response == ExpenseResponse.create(stored)
@@ -0,0 +1,59 @@
+"""
+The SQL of the Expense load profiles, checked on the compiled statements without a
+database.
+"""
+
+import re
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Load
+
+from app.sql_app.expense.expense import Expense
+from app.sql_app.load_profiles import LOAD_PROFILES, load_profile
+
+JOINED_TABLE = re.compile(r'\bJOIN "?(\w+)"? AS ')
+
+EXPECTED_JOINS = {
+    "detail": ["expense_name", "expense_category", "user"],
+    "update": ["expense_name"],
+}
+
+
+def _compile(name: str) -> str:
+    query = select(Expense).options(*load_profile(name))
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_every_profile_is_covered():
+    assert set(LOAD_PROFILES) == set(EXPECTED_JOINS)
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED_JOINS))
+def test_profile_joins(name: str):
+    sql = _compile(name)
+
+    assert JOINED_TABLE.findall(sql) == EXPECTED_JOINS[name]
+    assert "OUTER JOIN" not in sql
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED_JOINS))
+def test_profile_loads_in_one_statement_with_one_row_per_expense(name: str):
+    # Only many-to-one relationships are joined, so the rows are not multiplied,
+    # and nothing is left to a selectin or lazy load after the statement.
+    for option in load_profile(name):
+        if not isinstance(option, Load):
+            continue
+        for element in option.context:
+            assert element.strategy == (("lazy", "joined"),)
+            relationship = element.path[-2]
+            assert not relationship.uselist
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED_JOINS))
+def test_profile_raises_on_unloaded_relationships(name: str):
+    options = load_profile(name)
+
+    assert not isinstance(options[-1], Load)
+    assert options[-1].strategy == (("lazy", "raise"),)
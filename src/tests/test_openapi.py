@@ -0,0 +1,16 @@
+"""
+The OpenAPI schema documents the responses the routes return as raw JSON.
+"""
+
+from app.main import app
+
+
+def test_expense_list_documents_both_paginations():
+    schema = app.openapi()["paths"]["/api/v1/expenses/"]["get"]["responses"]["200"]
+    any_of = schema["content"]["application/json"]["schema"]["anyOf"]
+
+    assert {"$ref": "#/components/schemas/ExpensePage"} in any_of
+    assert {
+        "type": "array",
+        "items": {"$ref": "#/components/schemas/ExpenseResponse"},
+    } in any_of
@@ -0,0 +1,84 @@
+"""
+ProfilingMiddleware on a bare Starlette app, skipped when pyinstrument, the profiling
+extra, is not installed.
+"""
+
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+pytest.importorskip("pyinstrument")
+
+from app.core import profiling  # noqa: E402
+
+
+def _spin(iterations: int) -> int:
+    # Plain arithmetic, a call in the loop would take the self time instead.
+    total = 0
+    for i in range(iterations):
+        total += i * i
+    return total
+
+
+async def _endpoint(request: Request) -> PlainTextResponse:
+    _spin(1_000_000)
+    await asyncio.sleep(0.2)
+    return PlainTextResponse("ok")
+
+
+async def _is_admin(request: Request) -> bool:
+    return request.headers.get("x-admin") == "1"
+
+
+def _get(headers: dict[str, str]) -> httpx.Response:
+    app = profiling.ProfilingMiddleware(
+        Starlette(routes=[Route("/expenses", _endpoint)]), authorize=_is_admin
+    )
+
+    async def _run() -> httpx.Response:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            return await client.get("/expenses", headers=headers)
+
+    return asyncio.run(_run())
+
+
+def test_profiles_an_admin_request(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    monkeypatch.setattr(profiling.settings, "PROFILING_OUTPUT_DIR", str(tmp_path))
+
+    response = _get({"x-profile": "1", "x-admin": "1"})
+
+    assert response.status_code == 200 and response.text == "ok"
+    assert response.headers["server-timing"].startswith("total;dur=")
+    assert (tmp_path / f"{response.headers['x-profile-id']}.html").is_file()
+
+    # "_spin (tests/test_profiling.py:21) 48.2ms, ..."
+    top: list[tuple[str, float]] = [
+        (label.split(" (")[0], float(label.rsplit(" ", 1)[1].removesuffix("ms")))
+        for label in response.headers["x-profile-top"].split(", ")
+    ]
+    functions = [function for function, _ in top]
+    # Synthetic frames are left out, and the time _endpoint spends awaiting the
+    # sleep is not its own.
+    assert not any(function.startswith("[") for function in functions)
+    assert functions[0] == "_spin"
+    assert dict(top).get("_endpoint", 0.0) < 100
+
+
+def test_other_requests_are_not_profiled(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    monkeypatch.setattr(profiling.settings, "PROFILING_OUTPUT_DIR", str(tmp_path))
+
+    for headers in ({"x-admin": "1"}, {"x-profile": "1"}):
+        response = _get(headers)
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+    assert not any(tmp_path.iterdir())